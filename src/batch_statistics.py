@@ -0,0 +1,261 @@
+"""
+Статистики графов, вычисляемые сразу для всех повторений Монте-Карло.
+
+Повторения хранятся строками матрицы X формы (n_samples, n). Для
+дистанционных графов все метрики GraphAnalyzer выражаются через
+отсортированные строки и окна соседей (см. interval_graph.py), для
+KNN-графов — степени через векторизованный поиск соседей. Значения
+совпадают с поэлементным расчётом через GraphAnalyzer.
+"""
+
+import inspect
+
+import numpy as np
+
+from .build_graph import knn_neighbors, sorted_windows
+from .graph_analyzer import GraphAnalyzer
+
+# ограничение на размер промежуточного массива соседей (элементов)
+_KNN_BLOCK = 2**22
+
+
+def _positions(hi: np.ndarray) -> np.ndarray:
+    return np.arange(hi.shape[-1])
+
+
+def _degrees(xs: np.ndarray, hi: np.ndarray, d: float) -> np.ndarray:
+    S, n = hi.shape
+    # before[s, p] — число вершин слева, чьё окно заканчивается не позже p
+    flat = (np.arange(S)[:, None] * (n + 1) + hi).ravel()
+    counts = np.bincount(flat, minlength=S * (n + 1)).reshape(S, n + 1)
+    before = np.cumsum(counts, axis=1)[:, :n]
+    return hi - 1 - before
+
+
+def _max_degree(xs, hi, d):
+    return _degrees(xs, hi, d).max(axis=1)
+
+
+def _min_degree(xs, hi, d):
+    return _degrees(xs, hi, d).min(axis=1)
+
+
+def _connected_components(xs, hi, d):
+    return 1 + np.count_nonzero(np.diff(xs, axis=1) > d, axis=1)
+
+
+def _articulation_points(xs, hi, d):
+    gaps = np.diff(xs, axis=1)
+    joined = (gaps[:, :-1] <= d) & (gaps[:, 1:] <= d)
+    return np.count_nonzero(joined & (xs[:, 2:] - xs[:, :-2] > d), axis=1)
+
+
+def _count_triangles(xs, hi, d):
+    w = hi - _positions(hi) - 1
+    return np.sum(w * (w - 1) // 2, axis=1)
+
+
+def _clique_number(xs, hi, d):
+    return (hi - _positions(hi)).max(axis=1)
+
+
+def _jumps(hi: np.ndarray, step) -> np.ndarray:
+    """Число переходов p -> step(p) от p = 0 до выхода за n в каждой строке."""
+    S, n = hi.shape
+    rows = np.arange(S)
+    p = np.zeros(S, dtype=np.int64)
+    count = np.zeros(S, dtype=np.int64)
+    active = p < n
+    while active.any():
+        count += active
+        p = np.where(active, step(rows, np.minimum(p, n - 1)), p)
+        active = p < n
+    return count
+
+
+def _independence_number(xs, hi, d):
+    return _jumps(hi, lambda rows, p: hi[rows, p])
+
+
+def _domination_number(xs, hi, d):
+    return _jumps(hi, lambda rows, p: hi[rows, hi[rows, p] - 1])
+
+
+_DISTANCE_METRICS = {
+    "max_degree": _max_degree,
+    "min_degree": _min_degree,
+    "connected_components": _connected_components,
+    "articulation_points": _articulation_points,
+    "count_triangles": _count_triangles,
+    "clique_number": _clique_number,
+    "chromatic_number": _clique_number,
+    "max_independent_set": _independence_number,
+    "min_clique_cover": _independence_number,
+    "dominating_number": _domination_number,
+}
+
+
+def _knn_blocks(X: np.ndarray, k: int):
+    """Порции строк X с соседями: (start, stop, part, nbrs формы (c, n, k))."""
+    S, n = X.shape
+    block = max(1, _KNN_BLOCK // (2 * k * n))
+    for start in range(0, S, block):
+        stop = min(start + block, S)
+        part = X[start:stop]
+        yield start, stop, part, knn_neighbors(part, k)
+
+
+def _neighbor_degrees(part: np.ndarray, nbrs: np.ndarray) -> np.ndarray:
+    """Степени симметризованного графа по упорядоченным соседям nbrs."""
+    c, n, k = nbrs.shape
+    flat_nbrs = nbrs.reshape(c, -1)
+
+    def at_neighbors(a):
+        return np.take_along_axis(a, flat_nbrs, axis=1).reshape(nbrs.shape)
+
+    flat = np.arange(c)[:, None] * n + flat_nbrs
+    indeg = np.bincount(flat.ravel(), minlength=c * n).reshape(c, n)
+
+    kth = nbrs[..., -1]
+    kth_dist = np.abs(np.take_along_axis(part, kth, axis=1) - part)
+    dist = np.abs(part[..., None] - at_neighbors(part))
+    kd, ki = at_neighbors(kth_dist), at_neighbors(kth)
+    i = np.arange(n)[:, None]
+    mutual = (dist < kd) | ((dist == kd) & (i <= ki))
+    return k + indeg - mutual.sum(axis=-1)
+
+
+def knn_degrees(X: np.ndarray, k: int) -> np.ndarray:
+    """
+    Степени вершин симметризованных KNN-графов для каждой строки X.
+
+    deg(i) = k + (число j, у которых i среди соседей) - (число взаимных пар).
+    Пара (i, j) взаимна, если ключ (расстояние, индекс) точки i не больше
+    ключа k-го соседа точки j — сортировка рёбер не нужна.
+    """
+    out = np.empty(X.shape, dtype=np.int64)
+    for start, stop, part, nbrs in _knn_blocks(X, k):
+        out[start:stop] = _neighbor_degrees(part, nbrs)
+    return out
+
+
+def knn_degrees_sweep(X: np.ndarray, ks) -> dict[int, np.ndarray]:
+    """
+    Степени KNN-графов сразу для нескольких k: соседи ищутся один раз
+    для max(ks), первые k из них — соседи для меньшего k.
+    """
+    out = {k: np.empty(X.shape, dtype=np.int64) for k in ks}
+    for start, stop, part, nbrs in _knn_blocks(X, max(ks)):
+        for k in ks:
+            out[k][start:stop] = _neighbor_degrees(part, nbrs[..., :k])
+    return out
+
+
+def _knn_max_degree(degrees):
+    return degrees.max(axis=1)
+
+
+def _knn_min_degree(degrees):
+    return degrees.min(axis=1)
+
+
+_KNN_METRICS = {
+    "max_degree": _knn_max_degree,
+    "min_degree": _knn_min_degree,
+}
+
+
+def supports(graph_type: str, metric: str) -> bool:
+    """Есть ли пакетная реализация метрики для данного типа графа."""
+    if graph_type == "distance":
+        return metric in _DISTANCE_METRICS
+    if graph_type == "knn":
+        return metric in _KNN_METRICS
+    return False
+
+
+def _check_metrics(graph_type: str, metrics: dict[str, dict]) -> None:
+    for metric, metric_args in metrics.items():
+        if not supports(graph_type, metric):
+            raise ValueError(f"Нет пакетной реализации {metric} для графа {graph_type}")
+        inspect.signature(getattr(GraphAnalyzer, metric)).bind(None, **metric_args)
+
+
+def _distance_statistics(xs, metrics, d, windows) -> dict[str, np.ndarray]:
+    """Метрики дистанционного графа; windows — кэш окон {d: hi}."""
+    result = {}
+    for metric, metric_args in metrics.items():
+        metric_d = d
+        if metric == "clique_number" and metric_args.get("d") is not None:
+            metric_d = metric_args["d"]
+        if metric_d not in windows:
+            windows[metric_d] = sorted_windows(xs, metric_d)
+        result[metric] = _DISTANCE_METRICS[metric](xs, windows[metric_d], metric_d)
+    return result
+
+
+def batched_statistics(
+    X: np.ndarray,
+    graph_type: str,
+    graph_param: float | int,
+    metrics: dict[str, dict],
+) -> dict[str, np.ndarray]:
+    """
+    Значения нескольких метрик для всех строк X (повторений) разом.
+
+    metrics — словарь {имя метрики: её аргументы}. Сортировка строк,
+    окна соседей и степени KNN-графа считаются один раз для всех метрик.
+    Аргументы проверяются по сигнатуре метода GraphAnalyzer, так что
+    ошибки те же, что и при поэлементном вызове.
+    """
+    return batched_sweep(X, graph_type, [graph_param], metrics)[graph_param]
+
+
+def batched_sweep(
+    X: np.ndarray,
+    graph_type: str,
+    graph_params,
+    metrics: dict[str, dict],
+) -> dict:
+    """
+    Метрики для всех строк X и нескольких значений параметра графа:
+    {параметр: {метрика: значения}}.
+
+    Дистанционные графы вложены (рёбра для d1 < d2 — подмножество рёбер
+    для d2): строки сортируются один раз, окна для следующего d ищутся
+    начиная с окон предыдущего. Для KNN соседи ищутся один раз при
+    наибольшем k (см. knn_degrees_sweep).
+    """
+    _check_metrics(graph_type, metrics)
+    X = np.asarray(X, dtype=float)
+    params = sorted(set(graph_params))
+    if graph_type == "knn":
+        if params[0] <= 0:
+            raise ValueError("k должно быть положительным.")
+        degrees = knn_degrees_sweep(X, params)
+        return {
+            k: {metric: _KNN_METRICS[metric](degrees[k]) for metric in metrics}
+            for k in params
+        }
+
+    if params[0] <= 0:
+        raise ValueError("Параметр d должен быть положительным.")
+    xs = np.sort(X, axis=1)
+    result = {}
+    hi = None
+    for d in params:
+        hi = sorted_windows(xs, d, start=hi)
+        result[d] = _distance_statistics(xs, metrics, d, {d: hi})
+    return result
+
+
+def batched_statistic(
+    X: np.ndarray,
+    graph_type: str,
+    graph_param: float | int,
+    metric: str,
+    metric_args: dict = None,
+) -> np.ndarray:
+    """Значения одной метрики для всех строк X (см. batched_statistics)."""
+    metrics = {metric: metric_args or {}}
+    return batched_statistics(X, graph_type, graph_param, metrics)[metric]
@@ -0,0 +1,257 @@
+"""
+Замеры производительности построения графов, метрик и Монте-Карло.
+
+Запуск без внешних сервисов:
+
+    python -m src.benchmark --out baseline.json
+    python -m src.benchmark --compare baseline.json --tolerance 0.25
+
+Для каждого случая (функция, плотность графа, n) измеряется лучшее
+время из нескольких повторов и пиковая память (tracemalloc, отдельным
+прогоном — трассировка замедляет код). По времени при разных n
+подбирается показатель степени t ~ n^p. Результаты пишутся в JSON;
+в режиме сравнения код возврата 1, если какой-то случай медленнее
+базового больше чем в (1 + tolerance) раз.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .build_graph import build_distance_graph, build_knn_graph
+from .distribution_generators import generate_chi2
+from .graph_analyzer import GraphAnalyzer
+from .monte_carlo import monte_carlo_simulation
+
+SIZES = (100, 1000, 10000, 100000)
+K_VALUES = (3, 10)
+# средняя степень дистанционного графа на выборке N(0, 1)
+DEGREES = (2, 10)
+
+# метрики GraphAnalyzer: (метод, аргументы); на графах общего вида
+# (kNN) часть из них требует O(n²) памяти или перебора — предел n
+_METRICS = [
+    ("max_degree", {}),
+    ("min_degree", {}),
+    ("connected_components", {}),
+    ("articulation_points", {}),
+    ("count_triangles", {}),
+    ("chromatic_number", {}),
+    ("clique_number", {}),
+    ("max_independent_set", {}),
+    ("max_independent_set", {"exact": True}),
+    ("dominating_number", {}),
+    ("min_clique_cover", {}),
+]
+_GENERAL_LIMITS = {
+    # рекурсия networkx (ramsey_R2) переполняет стек уже при n ~ 1000
+    "max_independent_set": 100,
+    "max_independent_set(exact=True)": 1000,
+    "min_clique_cover": 100,
+}
+_MC_SAMPLES = 10**6  # n * n_samples для monte_carlo_simulation
+_MC_MAX_N = 10000
+
+
+def _distance_param(n: int, degree: float) -> float:
+    """d, при котором средняя степень на N(0, 1) примерно равна degree."""
+    # плотность пар на расстоянии <= d: 2d * ∫ φ² = d / √π
+    return degree * np.sqrt(np.pi) / n
+
+
+def cases(sizes=SIZES) -> list[dict]:
+    """
+    Список случаев: name, params, n и функция run() без аргументов.
+    Данные и графы готовятся заранее, в замер попадает только run().
+    """
+    result = []
+    for n in sizes:
+        data = np.random.default_rng(n).standard_normal(n)
+        for k in K_VALUES:
+            result.append(
+                _case(
+                    "build_knn_graph",
+                    {"k": k},
+                    n,
+                    lambda data=data, k=k: build_knn_graph(data, k, output="csr_graph"),
+                )
+            )
+        for degree in DEGREES:
+            d = _distance_param(n, degree)
+            result.append(
+                _case(
+                    "build_distance_graph",
+                    {"degree": degree},
+                    n,
+                    lambda data=data, d=d: build_distance_graph(
+                        data, d, output="csr_graph"
+                    ),
+                )
+            )
+        graphs = {
+            ("knn", K_VALUES[0]): build_knn_graph(
+                data, K_VALUES[0], output="csr_graph"
+            ),
+            ("distance", DEGREES[0]): build_distance_graph(
+                data, _distance_param(n, DEGREES[0]), output="csr_graph"
+            ),
+        }
+        for (graph_type, param), graph in graphs.items():
+            for metric, kwargs in _METRICS:
+                if metric == "clique_number" and graph_type == "knn":
+                    continue  # нужна координатная структура дистанционного графа
+                label = metric + "".join(f"({k}={v})" for k, v in kwargs.items())
+                limit = _GENERAL_LIMITS.get(label)
+                if graph_type == "knn" and limit is not None and n > limit:
+                    continue
+
+                def run(graph=graph, metric=metric, kwargs=kwargs):
+                    # новый анализатор: кэш промежуточных величин не переносится
+                    return getattr(GraphAnalyzer(graph), metric)(**kwargs)
+
+                params = {"graph": graph_type, "param": param, **kwargs}
+                result.append(_case(f"GraphAnalyzer.{metric}", params, n, run))
+        if n <= _MC_MAX_N:
+            n_samples = max(10, _MC_SAMPLES // n)
+            for graph_type, param in (("knn", 3), ("distance", _distance_param(n, 2))):
+
+                def run(n=n, graph_type=graph_type, param=param, n_samples=n_samples):
+                    return monte_carlo_simulation(
+                        generate_chi2,
+                        {"nu": 5, "n": n},
+                        n_samples=n_samples,
+                        graph_type=graph_type,
+                        graph_param=param,
+                        metric="max_degree",
+                        seed=0,
+                    )
+
+                params = {"graph": graph_type, "n_samples": n_samples}
+                result.append(_case("monte_carlo_simulation", params, n, run))
+    return result
+
+
+def _case(name, params, n, run) -> dict:
+    return {"name": name, "params": params, "n": n, "run": run}
+
+
+def _key(record: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(record["params"].items()))
+    return f"{record['name']}[{params}] n={record['n']}"
+
+
+def measure(run, min_time: float = 0.2, max_repeats: int = 5) -> dict:
+    """Лучшее время из повторов (до min_time суммарно) и пик памяти."""
+    times = []
+    while len(times) < max_repeats and sum(times) < min_time:
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "repeats": len(times), "peak_bytes": peak}
+
+
+def scaling_exponents(records: list[dict]) -> dict[str, float]:
+    """
+    Показатель p в t ~ n^p для каждой функции и набора параметров:
+    наклон прямой по точкам (log n, log t), нужно хотя бы два n.
+    """
+    groups = {}
+    for record in records:
+        params = ",".join(f"{k}={v}" for k, v in sorted(record["params"].items()))
+        groups.setdefault(f"{record['name']}[{params}]", []).append(record)
+    result = {}
+    for key, group in groups.items():
+        if len({record["n"] for record in group}) < 2:
+            continue
+        x = np.log([record["n"] for record in group])
+        y = np.log([max(record["seconds"], 1e-9) for record in group])
+        result[key] = float(np.polyfit(x, y, 1)[0])
+    return result
+
+
+def run_benchmarks(sizes=SIZES, pattern: str | None = None, verbose=True) -> dict:
+    """Выполняет все случаи (или содержащие pattern) и собирает отчёт."""
+    records = []
+    for case in cases(sizes):
+        if pattern is not None and pattern not in _key(case):
+            continue
+        record = {key: case[key] for key in ("name", "params", "n")}
+        record.update(measure(case["run"]))
+        records.append(record)
+        if verbose:
+            print(
+                f"{_key(record):72s} {record['seconds'] * 1e3:10.2f} ms "
+                f"{record['peak_bytes'] / 2**20:9.2f} MiB",
+                flush=True,
+            )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": records,
+        "scaling": scaling_exponents(records),
+    }
+
+
+def compare(
+    report: dict, baseline: dict, tolerance: float = 0.25, min_seconds: float = 1e-3
+) -> list[dict]:
+    """
+    Случаи, ставшие медленнее базовых больше чем в (1 + tolerance) раз.
+    Случаи быстрее min_seconds в базовом отчёте не сравниваются (шум).
+    """
+    old = {_key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in report["results"]:
+        base = old.get(_key(record))
+        if base is None or base["seconds"] < min_seconds:
+            continue
+        ratio = record["seconds"] / base["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append({"case": _key(record), "ratio": ratio})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--filter", default=None, help="подстрока имени случая")
+    parser.add_argument("--out", default=None, help="куда записать JSON-отчёт")
+    parser.add_argument("--compare", default=None, help="базовый JSON-отчёт")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-seconds", type=float, default=1e-3)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.filter)
+    for key, exponent in report["scaling"].items():
+        print(f"{key:60s} n^{exponent:.2f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.min_seconds)
+        for item in regressions:
+            print(f"[REGRESSION] {item['case']}: x{item['ratio']:.2f}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
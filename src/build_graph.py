@@ -1,54 +1,349 @@
 import networkx as nx
-from sklearn.neighbors import NearestNeighbors
 import numpy as np
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
 
+from .csr_graph import CSRGraph, node_coordinate
 
-def build_knn_graph(data: np.ndarray, k: int) -> nx.Graph:
+_OUTPUTS = ("networkx", "edges", "csr", "csr_graph")
+# метрики многомерных графов -> показатель p расстояния Минковского
+_METRICS = {"euclidean": 2.0, "chebyshev": np.inf}
+
+
+def _as_1d(data: np.ndarray) -> np.ndarray:
+    """Приводит выборку к одномерному массиву float (допускается форма (n, 1))."""
+    x = np.asarray(data, dtype=float)
+    if x.ndim == 2 and x.shape[1] == 1:
+        x = x[:, 0]
+    if x.ndim != 1:
+        raise ValueError("Ожидается одномерная выборка формы (n,) или (n, 1).")
+    return x
+
+
+def _as_points(data: np.ndarray) -> np.ndarray:
+    """Выборка как массив точек формы (n, p); одномерная — форма (n, 1)."""
+    x = np.asarray(data, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    if x.ndim != 2:
+        raise ValueError("Ожидается выборка формы (n,) или (n, p).")
+    return x
+
+
+def _minkowski_p(metric: str) -> float:
+    if metric not in _METRICS:
+        raise ValueError(
+            f"metric должна быть одной из {tuple(_METRICS)}, получено {metric!r}"
+        )
+    return _METRICS[metric]
+
+
+def _check_output(output: str) -> None:
+    if output not in _OUTPUTS:
+        raise ValueError(f"output должен быть одним из {_OUTPUTS}, получено {output!r}")
+
+
+def _edges_to_csr(rows: np.ndarray, cols: np.ndarray, n: int) -> sp.csr_matrix:
+    """Симметричная CSR-матрица смежности по списку рёбер (i < j)."""
+    data = np.ones(2 * rows.shape[0], dtype=np.int8)
+    A = sp.coo_matrix(
+        (data, (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+        shape=(n, n),
+    )
+    return A.tocsr()
+
+
+def _edges_to_networkx(
+    x: np.ndarray, rows: np.ndarray, cols: np.ndarray, **graph_attrs
+) -> nx.Graph:
+    """Собирает nx.Graph с атрибутом x у узлов по массивам рёбер."""
+    G = nx.Graph(**graph_attrs)
+    G.add_nodes_from((i, {"x": node_coordinate(coord)}) for i, coord in enumerate(x))
+    G.add_edges_from(zip(rows.tolist(), cols.tolist()))
+    return G
+
+
+def _format_output(
+    x: np.ndarray, rows: np.ndarray, cols: np.ndarray, output: str, d=None
+):
+    """Граф по рёбрам в формате output (см. build_distance_graph)."""
+    if output == "edges":
+        return rows, cols
+    if output == "csr":
+        return _edges_to_csr(rows, cols, x.shape[0])
+    if output == "csr_graph":
+        return CSRGraph.from_edges(rows, cols, x.shape[0], x, d=d)
+    if d is None:
+        return _edges_to_networkx(x, rows, cols)
+    return _edges_to_networkx(x, rows, cols, d=d)
+
+
+def sorted_windows(
+    xs: np.ndarray, d: float, start: np.ndarray | None = None
+) -> np.ndarray:
     """
-    Строит KNN‑граф в.
-    Каждая точка соединяется с k ближайшими (без само‑петель).
-    Узлы пронумерованы от 0 до len(data)-1.
+    Концы окон соседей на выборках, отсортированных по последней оси.
+
+    hi[..., p] — первая позиция q > p, для которой xs[q] - xs[p] > d
+    (или n). Ищется векторизованным бинарным поиском по тому же
+    предикату xs[q] - xs[p] <= d, что и попарная проверка
+    |data[i] - data[j]| <= d, поэтому окна совпадают с ней точно.
+    Ведущие оси — независимые выборки, обрабатываются одновременно.
+
+    start — известные окна для меньшего d (окна с ростом d только
+    растут), поиск тогда начинается с них.
+    """
+    xs = np.asarray(xs, dtype=float)
+    n = xs.shape[-1]
+    # инвариант: предикат истинен в lo и ложен в hi (hi = n — за краем)
+    if start is None:
+        lo = np.broadcast_to(np.arange(n), xs.shape).copy()
+    else:
+        lo = np.asarray(start) - 1
+    hi = np.full(xs.shape, n)
+    while True:
+        active = hi - lo > 1
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        probe = np.take_along_axis(xs, np.minimum(mid, n - 1), axis=-1)
+        ok = probe - xs <= d
+        lo = np.where(active & ok, mid, lo)
+        hi = np.where(active & ~ok, mid, hi)
+    return lo + 1
+
+
+def distance_windows(
+    x: np.ndarray, d: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Окна соседей для дистанционного графа на отсортированной выборке.
+
+    Возвращает (order, xs, hi): order — перестановка сортировки, xs = x[order],
+    hi[p] — конец (не включая) окна точки p, т.е. для p < q < hi[p]
+    выполняется xs[q] - xs[p] <= d (см. sorted_windows).
+    """
+    order = np.argsort(x, kind="stable")
+    xs = x[order]
+    return order, xs, sorted_windows(xs, d)
+
+
+def distance_graph_edges(data: np.ndarray, d: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Рёбра дистанционного графа за O(n log n + m).
+
+    Возвращает массивы (rows, cols) с rows < cols, упорядоченные
+    лексикографически — в том же порядке, в котором их перебирает
+    попарная проверка.
+    """
+    if d <= 0:
+        raise ValueError("Параметр d должен быть положительным.")
+
+    x = _as_1d(data)
+    order, _, hi = distance_windows(x, d)
+    n = x.shape[0]
+
+    pos = np.arange(n)
+    counts = hi - pos - 1
+    total = int(counts.sum())
+    src = np.repeat(pos, counts)
+    starts = np.cumsum(counts) - counts
+    dst = src + 1 + (np.arange(total) - np.repeat(starts, counts))
+
+    u, v = order[src], order[dst]
+    rows, cols = np.minimum(u, v), np.maximum(u, v)
+    idx = np.lexsort((cols, rows))
+    return rows[idx], cols[idx]
+
+
+def knn_neighbors(data: np.ndarray, k: int) -> np.ndarray:
+    """
+    k ближайших соседей для одномерных выборок без sklearn.
+
+    data имеет форму (..., n): последняя ось — выборка, ведущие оси —
+    независимые повторения. На отсортированной выборке k ближайших
+    к точке лежат в окне из 2k позиций вокруг неё, поэтому соседи
+    набираются слиянием левой и правой половин окна за k шагов.
+    Порядок — по (расстояние, индекс): равные расстояния разрешаются
+    в пользу меньшего индекса. С NearestNeighbors это совпадает только
+    без равных расстояний: там порядок при равенствах не определён
+    (на [1, 1, 1] при k = 1 он может вернуть саму точку вместо соседа).
+    Возвращает индексы соседей формы (..., n, k) в исходной нумерации,
+    упорядоченные по этому ключу.
+    """
+    x = np.asarray(data, dtype=float)
+    n = x.shape[-1]
+    if k >= n:
+        raise ValueError(f"k={k} должно быть меньше размера выборки n={n}.")
+
+    order = np.argsort(x, axis=-1, kind="stable")
+    xs = np.take_along_axis(x, order, axis=-1)
+
+    def gather(a, pos):
+        return np.take_along_axis(a, np.clip(pos, 0, n - 1), axis=-1)
+
+    pos = np.broadcast_to(np.arange(n), x.shape)
+    left, right = pos - 1, pos + 1
+    chosen = np.empty(x.shape + (k,), dtype=np.int64)
+    for t in range(k):
+        dl = np.where(left >= 0, xs - gather(xs, left), np.inf)
+        dr = np.where(right < n, gather(xs, right) - xs, np.inf)
+        tie = (dl == dr) & (gather(order, left) < gather(order, right))
+        take_left = (dl < dr) | tie
+        chosen[..., t] = np.where(take_left, left, right)
+        left = np.where(take_left, left - 1, left)
+        right = np.where(take_left, right, right + 1)
+    nbrs = np.take_along_axis(order[..., None, :], chosen, axis=-1)
+
+    # Слева от точки равные координаты идут по возрастанию индекса, т.е.
+    # в обратном порядке относительно слияния. Если в левой половине окна
+    # есть совпадающие координаты, соседей точки считаем полным перебором.
+    eq = np.zeros(x.shape, dtype=np.int64)
+    eq[..., 1:] = xs[..., 1:] == xs[..., :-1]
+    cum = np.cumsum(eq, axis=-1)
+    start = np.maximum(np.arange(n) - k - 1, 0)
+    ties = (cum - np.take_along_axis(cum, np.broadcast_to(start, x.shape), -1)) > 0
+    for idx in zip(*np.nonzero(ties)):
+        *batch, p = idx
+        row = x[tuple(batch)]
+        i = order[tuple(batch) + (p,)]
+        d_all = np.abs(row - row[i])
+        d_all[i] = np.inf
+        nbrs[tuple(batch) + (p,)] = np.lexsort((np.arange(n), d_all))[:k]
+
+    # из порядка сортировки обратно в исходную нумерацию
+    inverse = np.argsort(order, axis=-1)
+    return np.take_along_axis(nbrs, inverse[..., :, None], axis=-2)
+
+
+def knn_graph_edges(data: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Рёбра симметризованного KNN‑графа одномерной выборки.
+
+    Возвращает массивы (rows, cols) с rows < cols в лексикографическом порядке.
     """
     if k <= 0:
         raise ValueError("k должно быть положительным.")
 
-    G = nx.Graph()
-
-    for i, coord in enumerate(data):
-        G.add_node(i, x=float(coord))
+    x = _as_1d(data)
+    n = x.shape[0]
+    nbrs = knn_neighbors(x, k)
+    u = np.repeat(np.arange(n), k)
+    v = nbrs.ravel()
+    keys = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+    return keys // n, keys % n
 
-    nbrs = NearestNeighbors(n_neighbors=k + 1).fit(data.reshape(-1, 1))
-    # distances[i], indices[i] — k+1 ближайших (включая саму точку)
-    _, indices = nbrs.kneighbors(data.reshape(-1, 1))
 
-    for i, neighs in enumerate(indices):
-        for j in neighs:
-            if i != j:
-                G.add_edge(i, j)
-    return G
+def kdtree_knn_edges(
+    points: np.ndarray, k: int, metric: str = "euclidean", workers: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Рёбра симметризованного KNN‑графа точек формы (n, p) через
+    cKDTree.query: k + 1 соседей всех точек одним запросом (workers —
+    потоки, -1 — все ядра), затем из строки убирается сама точка (при
+    совпадающих координатах она может оказаться не первой — тогда
+    отбрасывается последний сосед). Рёбра (rows, cols), rows < cols, в
+    лексикографическом порядке.
+    """
+    points = _as_points(points)
+    n = points.shape[0]
+    if k >= n:
+        raise ValueError(f"k={k} должно быть меньше размера выборки n={n}.")
+    tree = cKDTree(points)
+    _, nbrs = tree.query(points, k=k + 1, p=_minkowski_p(metric), workers=workers)
+    keep = nbrs != np.arange(n)[:, None]
+    keep[keep.all(axis=1), -1] = False
+    u = np.repeat(np.arange(n), k)
+    v = nbrs[keep]
+    keys = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+    return keys // n, keys % n
 
 
-def build_distance_graph(data: np.ndarray, d: float) -> nx.Graph:
+def kdtree_distance_edges(
+    points: np.ndarray, d: float, metric: str = "euclidean"
+) -> tuple[np.ndarray, np.ndarray]:
     """
-    Строит граф по расстоянию d.
-    Проводит ребро между i и j, если |data[i] - data[j]| <= d.
+    Рёбра дистанционного графа точек формы (n, p): пары на расстоянии
+    не больше d из cKDTree.query_pairs — память O(n + m), без матрицы
+    расстояний. Рёбра (rows, cols), rows < cols, в лексикографическом
+    порядке.
     """
     if d <= 0:
         raise ValueError("Параметр d должен быть положительным.")
+    tree = cKDTree(_as_points(points))
+    pairs = tree.query_pairs(d, p=_minkowski_p(metric), output_type="ndarray")
+    rows, cols = pairs[:, 0].astype(np.int64), pairs[:, 1].astype(np.int64)
+    idx = np.lexsort((cols, rows))
+    return rows[idx], cols[idx]
 
-    n = data.shape[0]
-    G = nx.Graph()
 
-    for i, coord in enumerate(data):
-        G.add_node(i, x=float(coord))
+def build_knn_graph(
+    data: np.ndarray,
+    k: int,
+    output: str = "networkx",
+    metric: str = "euclidean",
+    workers: int = 1,
+):
+    """
+    Строит KNN‑граф в.
+    Каждая точка соединяется с k ближайшими (без само‑петель).
+    Узлы пронумерованы от 0 до len(data)-1.
 
-    # проверяем все пары (i, j) с i < j
-    for i in range(n):
-        for j in range(i + 1, n):
-            if abs(data[i] - data[j]) <= d:
-                G.add_edge(i, j)
+    Для одномерных данных (форма (n,) или (n, 1)) соседи ищутся по окнам
+    отсортированной выборки без NearestNeighbors. Многомерные точки
+    (форма (n, p), p > 1) — через cKDTree (см. kdtree_knn_edges) с
+    метрикой metric ('euclidean' или 'chebyshev') в workers потоков;
+    атрибут x узлов тогда — кортеж координат. output — как в
+    build_distance_graph: 'networkx', 'edges', 'csr' или 'csr_graph'.
+    """
+    if k <= 0:
+        raise ValueError("k должно быть положительным.")
+    _check_output(output)
+    _minkowski_p(metric)
 
-    if G.number_of_edges() == 0:
-        print("[WARNING] Все вершины изолированы при данном d.")
+    x = _as_points(data)
+    if x.shape[1] == 1:
+        x = x[:, 0]
+        rows, cols = knn_graph_edges(x, k)
+    else:
+        rows, cols = kdtree_knn_edges(x, k, metric, workers)
+    return _format_output(x, rows, cols, output)
 
-    return G
+
+def build_distance_graph(
+    data: np.ndarray, d: float, output: str = "networkx", metric: str = "euclidean"
+):
+    """
+    Строит граф по расстоянию d.
+    Проводит ребро между i и j, если |data[i] - data[j]| <= d.
+
+    Выборка сортируется один раз, окна соседей всех точек находятся
+    векторизованным бинарным поиском sorted_windows (тем же предикатом
+    |data[i] - data[j]| <= d), так что сложность O(n log n + m).
+    Многомерные точки (форма (n, p), p > 1) соединяются, если расстояние
+    metric ('euclidean' или 'chebyshev') не больше d; пары ищутся через
+    cKDTree (см. kdtree_distance_edges). Для одномерных данных обе
+    метрики совпадают с |data[i] - data[j]|.
+
+    output:
+        'networkx' — nx.Graph с атрибутом x у узлов и G.graph['d'] = d
+        (по умолчанию);
+        'edges' — кортеж массивов (rows, cols), rows < cols;
+        'csr' — симметричная scipy.sparse.csr_matrix смежности;
+        'csr_graph' — компактный CSRGraph (см. csr_graph.py), который
+        GraphAnalyzer обрабатывает без перехода к networkx.
+    Параметр d сохраняется в графе, по нему GraphAnalyzer включает
+    точные алгоритмы для графов интервалов.
+    """
+    _check_output(output)
+    _minkowski_p(metric)
+    x = _as_points(data)
+    if x.shape[1] == 1:
+        x = x[:, 0]
+        rows, cols = distance_graph_edges(x, d)
+    else:
+        rows, cols = kdtree_distance_edges(x, d, metric)
+
+    if rows.shape[0] == 0:
+        print("[WARNING] Все вершины изолированы при данном d.")
+    return _format_output(x, rows, cols, output, d=d)
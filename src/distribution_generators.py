@@ -1,18 +1,134 @@
-from scipy.stats import chi, chi2
 import numpy as np
 
+# Размер блока для преобразования Чамберса–Маллоуса–Стака: вспомогательные
+# буферы занимают 2 * _BLOCK чисел независимо от размера выборки.
+_BLOCK = 2**16
 
-def generate_chi2(nu: int, n: int) -> np.ndarray:
+
+def _generator(rng: np.random.Generator | None) -> np.random.Generator:
+    """
+    Генератор для старых функций: переданный или порождённый из глобального
+    состояния np.random (так np.random.seed по-прежнему воспроизводит данные).
+    """
+    if rng is not None:
+        return rng
+    return np.random.default_rng(np.random.randint(2**63 - 1, dtype=np.int64))
+
+
+def _output(size: int | tuple | None, out: np.ndarray | None) -> np.ndarray:
+    """
+    Выходной буфер float64: переданный out или новый массив формы size
+    (size=None — одно значение, массив формы ()).
+    """
+    if out is None:
+        return np.empty(() if size is None else size, dtype=np.float64)
+    if out.dtype != np.float64 or not out.flags.c_contiguous:
+        raise ValueError("out должен быть C-непрерывным массивом float64.")
+    shape = (size,) if np.isscalar(size) else size
+    if size is not None and out.shape != tuple(shape):
+        raise ValueError(f"Форма out {out.shape} не совпадает с size={size}.")
+    return out
+
+
+def draw_chi2(
+    rng: np.random.Generator,
+    nu: float,
+    size: int | tuple | None = None,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Выборка из χ²(nu) как 2·Gamma(nu/2) прямо в буфер out.
+    size может быть кортежем, например (n_samples, n).
+    """
+    out = _output(size, out)
+    rng.standard_gamma(nu / 2, size=out.shape, out=out)
+    out *= 2.0
+    return out
+
+
+def draw_chi(
+    rng: np.random.Generator,
+    nu: float,
+    size: int | tuple | None = None,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """Выборка из χ(nu) как корень из χ²(nu), на месте."""
+    out = draw_chi2(rng, nu, size, out)
+    np.sqrt(out, out=out)
+    return out
+
+
+def draw_normal(
+    rng: np.random.Generator,
+    sigma: float,
+    size: int | tuple | None = None,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """Выборка из N(0, sigma^2) на месте."""
+    out = _output(size, out)
+    rng.standard_normal(size=out.shape, out=out)
+    out *= sigma
+    return out
+
+
+def draw_stable(
+    rng: np.random.Generator,
+    alpha: float,
+    size: int | tuple | None = None,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Выборка из симметричного Stable(alpha) по формуле Чамберса–Маллоуса–Стака.
+
+    Преобразование выполняется блоками на месте: U хранится прямо в out,
+    W и промежуточный множитель — в двух буферах размера блока.
+    """
+    out = _output(size, out)
+    flat = out.reshape(-1)
+    m = min(_BLOCK, flat.shape[0])
+    w = np.empty(m)
+    t = np.empty(m)
+
+    for start in range(0, flat.shape[0], _BLOCK):
+        stop = start + _BLOCK
+        u = flat[start:stop]
+        k = u.shape[0]
+        # U ~ Uniform(-pi/2, pi/2)
+        rng.random(out=u)
+        u -= 0.5
+        u *= np.pi
+        if alpha == 1.0:
+            # Cauchy case
+            np.tan(u, out=u)
+            continue
+        wk, tk = w[:k], t[:k]
+        rng.standard_exponential(out=wk)
+        # factor = (cos((1 - alpha) U) / W) ** ((1 - alpha) / alpha)
+        np.multiply(u, 1 - alpha, out=tk)
+        np.cos(tk, out=tk)
+        np.divide(tk, wk, out=tk)
+        np.power(tk, (1 - alpha) / alpha, out=tk)
+        # frac = sin(alpha U) / cos(U) ** (1 / alpha)
+        np.cos(u, out=wk)
+        np.power(wk, 1 / alpha, out=wk)
+        u *= alpha
+        np.sin(u, out=u)
+        u /= wk
+        u *= tk
+    return out
+
+
+def generate_chi2(nu: int, n: int, rng: np.random.Generator = None) -> np.ndarray:
     """Генерация данных из χ²"""
-    return chi2.rvs(df=nu, size=n)
+    return draw_chi2(_generator(rng), nu, n)
 
 
-def generate_chi(nu: int, n: int) -> np.ndarray:
+def generate_chi(nu: int, n: int, rng: np.random.Generator = None) -> np.ndarray:
     """Генерация данных из χ"""
-    return chi.rvs(df=nu, size=n)
+    return draw_chi(_generator(rng), nu, n)
 
 
-def sample_stable(alpha: float, n: int) -> np.ndarray:
+def sample_stable(alpha: float, n: int, rng: np.random.Generator = None) -> np.ndarray:
     """
     Генерация n сэмплов из симметричного стабильного распределения Stable(alpha).
     Используем алгоритм Чамберса–Маллин–Стэпса.
@@ -22,26 +138,28 @@ def sample_stable(alpha: float, n: int) -> np.ndarray:
         Параметр устойчивости (0 < alpha <= 2).
     n : int
         Число выборок.
+    rng : np.random.Generator, optional
+        Генератор случайных чисел; по умолчанию порождается из глобального
+        состояния np.random.
     Возвращает:
     -------
     samples : np.ndarray, shape (n,)
     """
-    # Сэмплируем по формуле Чамберса–Маллин–Стэпса
-    U = np.random.uniform(-np.pi / 2, np.pi / 2, size=n)
-    W = np.random.exponential(scale=1.0, size=n)
-    if alpha == 1.0:
-        # Cauchy case
-        return np.tan(U)
-    else:
-        numerator = np.sin(alpha * U)
-        denominator = (np.cos(U)) ** (1 / alpha)
-        frac = numerator / denominator
-        factor = (np.cos(U - alpha * U) / W) ** ((1 - alpha) / alpha)
-        return frac * factor
+    return draw_stable(_generator(rng), alpha, n)
 
 
-def sample_normal(sigma: float, n: int) -> np.ndarray:
+def sample_normal(sigma: float, n: int, rng: np.random.Generator = None) -> np.ndarray:
     """
     Генерация n сэмплов из нормального распределения N(0, sigma^2).
     """
-    return np.random.normal(loc=0.0, scale=sigma, size=n)
+    return draw_normal(_generator(rng), sigma, n)
+
+
+# Старые функции и их пакетные аналоги: monte_carlo генерирует по ним
+# сразу матрицу (n_samples, n) вместо n_samples отдельных вызовов.
+BATCH_SAMPLERS = {
+    generate_chi2: draw_chi2,
+    generate_chi: draw_chi,
+    sample_stable: draw_stable,
+    sample_normal: draw_normal,
+}
@@ -0,0 +1,275 @@
+"""
+Размеченные наборы признаков графов для классификаторов H0/H1 вне памяти.
+
+Набор строится порциями фиксированного размера: в каждой порции поровну
+выборок H0 (метка 0) и H1 (метка 1), признаки — метрики GraphAnalyzer
+(пакетные, где есть, см. batch_statistics), строки порции перемешаны.
+Порции пишутся на диск сразу, в памяти держится только текущая:
+
+    format='memmap' — features.npy (float32, строки x признаки) и
+        labels.npy (int8), открытые через np.lib.format.open_memmap;
+    format='npz'    — по файлу chunk_000000.npz (X, y) на порцию.
+
+В meta.json — описание набора и число готовых порций: прерванное
+построение продолжается с первой недостающей, а при тех же параметрах
+готовый набор просто открывается. FeatureDataset.iter_chunks отдаёт
+(X, y) порциями для partial_fit классификаторов sklearn.
+"""
+
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from .monte_carlo import normalize_metrics, resolve_n_jobs, simulate_chunk
+from .result_cache import cache_key, jsonable
+
+_META = "meta.json"
+_FEATURES = "features.npy"
+_LABELS = "labels.npy"
+CLASSES = np.array([0, 1], dtype=np.int8)
+
+
+def _chunk(
+    seed: np.random.SeedSequence,
+    counts: tuple[int, int],
+    h0,
+    h1,
+    n: int,
+    graph_type: str,
+    graph_param,
+    metrics: dict,
+    batched: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Одна порция: признаки H0 и H1 со своими генераторами, перемешанные."""
+    h0_seed, h1_seed, shuffle_seed = seed.spawn(3)
+    parts = []
+    for (distribution, params), count, child in zip(
+        (h0, h1), counts, (h0_seed, h1_seed)
+    ):
+        columns = simulate_chunk(
+            count,
+            child,
+            distribution,
+            {**params, "n": n},
+            graph_type,
+            graph_param,
+            metrics,
+            batched,
+        )
+        parts.append(np.column_stack([columns[name] for name in metrics]))
+    X = np.concatenate(parts).astype(np.float32)
+    y = np.repeat(CLASSES, counts)
+    order = np.random.default_rng(shuffle_seed).permutation(y.shape[0])
+    return X[order], y[order]
+
+
+class FeatureDataset:
+    """Готовый (или строящийся) набор в каталоге path."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / _META).read_text())
+
+    @property
+    def features(self) -> list[str]:
+        return self.meta["features"]
+
+    @property
+    def complete(self) -> bool:
+        return self.meta["chunks_done"] == len(self.meta["chunk_rows"])
+
+    def __len__(self) -> int:
+        return sum(self.meta["chunk_rows"][: self.meta["chunks_done"]])
+
+    def _bounds(self) -> np.ndarray:
+        return np.concatenate([[0], np.cumsum(self.meta["chunk_rows"])])
+
+    def chunk(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        """Порция index: (X float32, y int8); для memmap — срезы без копии."""
+        if index >= self.meta["chunks_done"]:
+            raise IndexError(f"Порция {index} ещё не построена.")
+        if self.meta["format"] == "npz":
+            with np.load(self.path / f"chunk_{index:06d}.npz") as data:
+                return data["X"], data["y"]
+        bounds = self._bounds()
+        start, stop = bounds[index], bounds[index + 1]
+        X, y = self.arrays()
+        return X[start:stop], y[start:stop]
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Весь набор: memmap только для чтения (для npz — склеенные порции)."""
+        if self.meta["format"] == "npz":
+            chunks = [self.chunk(i) for i in range(self.meta["chunks_done"])]
+            return (
+                np.concatenate([X for X, _ in chunks]),
+                np.concatenate([y for _, y in chunks]),
+            )
+        X = np.load(self.path / _FEATURES, mmap_mode="r")
+        y = np.load(self.path / _LABELS, mmap_mode="r")
+        return X[: len(self)], y[: len(self)]
+
+    def iter_chunks(self, shuffle: bool = False, seed=None):
+        """
+        (X, y) по порциям для partial_fit, например:
+
+            for X, y in dataset.iter_chunks(shuffle=True, seed=epoch):
+                clf.partial_fit(X, y, classes=CLASSES)
+
+        shuffle перемешивает порядок порций (строки внутри порции уже
+        перемешаны при построении).
+        """
+        order = np.arange(self.meta["chunks_done"])
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for index in order:
+            X, y = self.chunk(int(index))
+            yield np.asarray(X), np.asarray(y)
+
+
+def build_feature_dataset(
+    path: str | os.PathLike,
+    h0: tuple,  # (distribution, params) — выборки H0, например (generate_chi2, {"nu": 5})
+    h1: tuple,  # (distribution, params) — выборки H1
+    n: int,
+    n_samples: int,  # выборок на каждый класс
+    graph_type: str = "knn",
+    graph_param: float | int = 3,
+    features: list[str] = ("max_degree",),
+    feature_args: dict = None,
+    chunk_size: int = 10000,
+    format: str = "memmap",
+    seed: int | np.random.SeedSequence | None = None,
+    batched: bool = True,
+    n_jobs: int = 1,
+    executor: Executor | None = None,
+) -> FeatureDataset:
+    """
+    Строит набор признаков в каталоге path и возвращает FeatureDataset.
+
+    Параметры:
+    ------------
+    h0, h1 : пары (функция распределения, параметры без n)
+    n : размер выборки, n_samples : число выборок каждого класса
+    graph_type, graph_param : как в monte_carlo_simulation
+    features, feature_args : метрики GraphAnalyzer и их аргументы
+        ({имя метрики: аргументы}, как metric_args для списка метрик)
+    chunk_size : строк в порции (поровну H0 и H1), чётное
+    format : 'memmap' или 'npz'
+    seed : зерно; порция i получает SeedSequence(seed).spawn(...)[i],
+        поэтому результат не зависит от n_jobs и от того, прерывалось ли
+        построение. Без seed продолжение прерванного построения невозможно.
+    n_jobs, executor : процессы для порций (как в monte_carlo_simulation)
+    """
+    if graph_type not in ("knn", "distance"):
+        raise ValueError("graph_type должен быть 'knn' или 'distance'")
+    if format not in ("memmap", "npz"):
+        raise ValueError("format должен быть 'memmap' или 'npz'")
+    if chunk_size < 2 or chunk_size % 2:
+        raise ValueError("chunk_size должен быть чётным и не меньше 2.")
+    metrics = normalize_metrics(list(features), feature_args)
+    path = Path(path)
+
+    per_class = chunk_size // 2
+    counts = [per_class] * (n_samples // per_class)
+    if n_samples % per_class:
+        counts.append(n_samples % per_class)
+    spec = dict(
+        h0=h0,
+        h1=h1,
+        n=n,
+        n_samples=n_samples,
+        graph_type=graph_type,
+        graph_param=graph_param,
+        features=metrics,
+        chunk_size=chunk_size,
+        format=format,
+        seed=seed,
+        batched=batched,
+    )
+    key = cache_key(**spec)
+
+    done = 0
+    if (path / _META).exists():
+        meta = json.loads((path / _META).read_text())
+        if meta["key"] != key or seed is None:
+            raise ValueError(
+                f"В {path} уже есть набор с другими параметрами (или без seed)."
+            )
+        done = meta["chunks_done"]
+    else:
+        path.mkdir(parents=True, exist_ok=True)
+        meta = json.loads(json.dumps(spec, default=jsonable))
+        meta.update(
+            key=key,
+            features=list(metrics),
+            chunk_rows=[2 * count for count in counts],
+            chunks_done=0,
+        )
+        if format == "memmap":
+            rows = 2 * n_samples
+            np.lib.format.open_memmap(
+                path / _FEATURES, "w+", np.float32, (rows, len(metrics))
+            ).flush()
+            np.lib.format.open_memmap(path / _LABELS, "w+", np.int8, (rows,)).flush()
+        _write_meta(path, meta)
+
+    root = seed if isinstance(seed, np.random.SeedSequence) else None
+    if root is None:
+        root = np.random.SeedSequence(seed)
+    children = root.spawn(len(counts))
+    job = partial(
+        _chunk,
+        h0=h0,
+        h1=h1,
+        n=n,
+        graph_type=graph_type,
+        graph_param=graph_param,
+        metrics=metrics,
+        batched=batched,
+    )
+    todo = list(range(done, len(counts)))
+    args = (
+        [children[i] for i in todo],
+        [(counts[i], counts[i]) for i in todo],
+    )
+    bounds = np.concatenate([[0], np.cumsum(meta["chunk_rows"])])
+
+    def collect(results):
+        for index, (X, y) in zip(todo, results):
+            if format == "npz":
+                target = path / f"chunk_{index:06d}.npz"
+                tmp = target.with_name(target.stem + ".tmp.npz")
+                np.savez(tmp, X=X, y=y)
+                os.replace(tmp, target)
+            else:
+                start, stop = bounds[index], bounds[index + 1]
+                features_mm = np.load(path / _FEATURES, mmap_mode="r+")
+                labels_mm = np.load(path / _LABELS, mmap_mode="r+")
+                features_mm[start:stop] = X
+                labels_mm[start:stop] = y
+                features_mm.flush()
+                labels_mm.flush()
+                del features_mm, labels_mm
+            meta["chunks_done"] = index + 1
+            _write_meta(path, meta)
+
+    n_jobs = resolve_n_jobs(n_jobs)
+    if executor is not None:
+        collect(executor.map(job, *args))
+    elif n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            collect(pool.map(job, *args))
+    else:
+        collect(map(job, *args))
+    return FeatureDataset(path)
+
+
+def _write_meta(path: Path, meta: dict) -> None:
+    """meta.json через временный файл: счётчик порций не бывает битым."""
+    tmp = path / (_META + ".tmp")
+    tmp.write_text(json.dumps(meta, indent=1))
+    os.replace(tmp, path / _META)
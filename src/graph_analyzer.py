@@ -1,90 +1,304 @@
 import networkx as nx
 import numpy as np
 
+from . import csr_graph
+from .build_graph import distance_graph_edges, sorted_windows
+from .csr_graph import CSRGraph
+from .independent_set import (
+    IndependentSetResult,
+    clique_number,
+    maximum_independent_set,
+)
+from .interval_graph import UnitIntervalGraph
+
 
 class GraphAnalyzer:
-    def __init__(self, G: nx.Graph) -> None:
-        """Инициализирует анализатор графов по матрице смежности."""
-        if isinstance(G, np.ndarray):
-            self.G = nx.from_numpy_array(G)
+    def __init__(self, G: nx.Graph | CSRGraph, d: float | None = None) -> None:
+        """
+        Инициализирует анализатор графов по матрице смежности.
+
+        Принимает nx.Graph, плотную матрицу смежности np.ndarray или
+        CSRGraph. Для CSRGraph метрики считаются по массивам CSR,
+        а nx.Graph строится только по обращению к self.G.
+
+        d — параметр дистанционного графа. Если он задан (явно или через
+        G.graph['d'] / CSRGraph.d из build_distance_graph) и у вершин есть
+        координаты x, граф считается графом единичных интервалов и все
+        метрики считаются точно проходом по отсортированным координатам —
+        но только если рёбра графа совпадают с рёбрами дистанционного графа
+        на этих координатах (иначе граф изменён и используется общий путь).
+
+        Общие промежуточные величины (степени, отсортированные координаты,
+        компоненты, дополнение графа) вычисляются при первом обращении и
+        кэшируются. После изменения графа нужно вызвать invalidate().
+        """
+        self._cache = {}
+        self.csr = None
+        if isinstance(G, CSRGraph):
+            self.csr = G
+            self._G = None
+            self.n = G.number_of_nodes()
+        else:
+            self.G = nx.from_numpy_array(G) if isinstance(G, np.ndarray) else G
+
+        if d is None:
+            d = self.csr.d if self.csr is not None else self.G.graph.get("d")
+        self.d = d
+
+    def _cached(self, key: str | tuple, compute):
+        """Значение из кэша промежуточных величин или compute()."""
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает кэш промежуточных величин. Вызывается после изменения
+        графа (например, self.G.add_edge(...)): метрики будут пересчитаны,
+        режим графа интервалов заново проверяется по степеням. Если граф
+        networkx уже построен из CSRGraph, источником считается он.
+        """
+        self._cache = {}
+        if self._G is not None:
+            self.csr = None
+        if self.csr is not None:
+            self.n = self.csr.number_of_nodes()
         else:
-            self.G = G
-        self.n = self.G.number_of_nodes()
+            self.n = self._G.number_of_nodes()
+
+    @property
+    def interval(self) -> UnitIntervalGraph | None:
+        """Представление графа единичных интервалов или None, если d неизвестно."""
+        return self._cached("interval", self._make_interval)
+
+    def _make_interval(self) -> UnitIntervalGraph | None:
+        if self.d is None or self.n == 0:
+            return None
+        x = self._coordinates()
+        if x is None or x.ndim != 1:
+            return None
+        interval = UnitIntervalGraph(x, self.d)
+        # быстрая отбраковка по степеням, затем точное сравнение рёбер с
+        # окнами: перестановка рёбер сохраняет степени, но не рёбра
+        expected = np.sort(interval.degrees())
+        if not np.array_equal(expected, np.sort(self._graph_degrees())):
+            return None
+        rows, cols = self._csr().edges()
+        expected_rows, expected_cols = distance_graph_edges(x, self.d)
+        if not (
+            np.array_equal(rows, expected_rows) and np.array_equal(cols, expected_cols)
+        ):
+            return None
+        return interval
+
+    def _coordinates(self) -> np.ndarray | None:
+        """Координаты вершин (атрибут x) или None, если их нет."""
+        return self._cached("x", self._extract_coordinates)
+
+    def _extract_coordinates(self) -> np.ndarray | None:
+        if self.csr is not None:
+            return self.csr.x
+        nodes = self.G.nodes
+        if not all("x" in nodes[node] for node in nodes):
+            return None
+        return np.array([nodes[node]["x"] for node in nodes], dtype=float)
+
+    def sorted_coordinates(self) -> np.ndarray | None:
+        """
+        Отсортированные координаты вершин (кэшируются) или None — также для
+        многомерных координат.
+        """
+        interval = self.interval
+        if interval is not None:
+            return interval.xs
+        return self._cached("xs", self._sort_coordinates)
+
+    def _sort_coordinates(self) -> np.ndarray | None:
+        x = self._coordinates()
+        return None if x is None or x.ndim != 1 else np.sort(x)
+
+    def degrees(self) -> np.ndarray:
+        """
+        Массив степеней вершин (кэшируется). Для графа интервалов — в
+        порядке сортировки координат, иначе — в порядке вершин.
+        """
+        return self._cached("degrees", self._compute_degrees)
+
+    def _compute_degrees(self) -> np.ndarray:
+        if self.interval is not None:
+            return self.interval.degrees()
+        return self._graph_degrees()
+
+    def _graph_degrees(self) -> np.ndarray:
+        """Степени по рёбрам графа в порядке вершин (без режима интервалов)."""
+        return self._cached("graph_degrees", self._count_degrees)
+
+    def _count_degrees(self) -> np.ndarray:
+        if self.csr is not None:
+            return self.csr.degrees()
+        return np.array([deg for _, deg in self.G.degree()], dtype=np.int64)
+
+    def component_labels(self) -> tuple[int, np.ndarray]:
+        """Число компонент и метки компонент вершин (кэшируются)."""
+        return self._cached("components", self._compute_components)
+
+    def _compute_components(self) -> tuple[int, np.ndarray]:
+        if self.csr is not None:
+            return csr_graph.connected_components(self.csr)
+        index = {node: i for i, node in enumerate(self.G.nodes)}
+        labels = np.empty(self.n, dtype=np.int64)
+        count = 0
+        for count, component in enumerate(nx.connected_components(self.G), 1):
+            labels[[index[node] for node in component]] = count - 1
+        return count, labels
+
+    def complement(self) -> nx.Graph:
+        """Дополнение графа (O(n²) рёбер, строится один раз)."""
+        return self._cached("complement", lambda: nx.complement(self.G))
+
+    @property
+    def G(self) -> nx.Graph:
+        """Граф networkx (для CSRGraph — преобразование для совместимости)."""
+        if self._G is None:
+            self._G = self.csr.to_networkx()
+        return self._G
+
+    @G.setter
+    def G(self, G: nx.Graph) -> None:
+        self._G = G
+        self.csr = None
+        self.invalidate()
 
     def max_degree(self) -> int:
         """Возвращает максимальную степень вершины в графе."""
-        return max(dict(self.G.degree()).values())
+        return int(self.degrees().max())
 
     def min_degree(self) -> int:
         """Возвращает минимальную степень вершины в графе."""
-        return min(dict(self.G.degree()).values())
+        return int(self.degrees().min())
 
     def connected_components(self) -> int:
         """Вычисляет количество связных компонент графа."""
-        return nx.number_connected_components(self.G)
+        if self.interval is not None:
+            return self.interval.connected_components()
+        return int(self.component_labels()[0])
 
     def articulation_points(self) -> int:
         """Возвращает количество точек сочленения в графе."""
+        if self.interval is not None:
+            return self.interval.articulation_points()
+        if self.csr is not None:
+            return len(csr_graph.articulation_points(self.csr))
         return len(list(nx.articulation_points(self.G)))
 
     def count_triangles(self) -> int:
         """Подсчитывает общее количество треугольников в графе."""
-        return sum(nx.triangles(self.G).values()) // 3
+        if self.interval is not None:
+            return self.interval.count_triangles()
+        return csr_graph.count_triangles(self._csr())
 
     def chromatic_number(self) -> int:
-        """Жадное приближение хроматического числа (DSATUR)."""
-        # Используем только greedy DSATUR
-        colors = nx.coloring.greedy_color(self.G, strategy="DSATUR")
-        return max(colors.values()) + 1
+        """
+        Жадное приближение хроматического числа (DSATUR).
+        Для графа интервалов — точное значение χ = ω.
+        """
+        if self.interval is not None:
+            return self.interval.chromatic_number()
+        # DSATUR на массивах CSR, порядок вершин как в nx.greedy_color
+        return int(csr_graph.dsatur_coloring(self._csr()).max()) + 1
 
-    def clique_number(self, d: float) -> int:
+    def clique_number(self, d: float | None = None) -> int:
         """Возвращает размер наибольшей клики в графе.
-        d - dist в дистанционном графе"""
-        if self.G.number_of_nodes() == 0:
+        d - dist в дистанционном графе (по умолчанию - d графа)
+        Для многомерных координат окна на прямой неприменимы: кликовое
+        число самого графа считается точно (см. independent_set.clique_number),
+        поэтому d должно совпадать с d графа."""
+        if self.n == 0:
             raise ValueError("Граф пуст")
+        if d is None:
+            d = self.d
+        if d is None:
+            raise ValueError("Не задан параметр d дистанционного графа.")
+        if d == self.d and self.interval is not None:
+            return self.interval.clique_number()
 
-        # Извлекаем координаты из атрибутов узлов
-
-        data = [self.G.nodes[node]["x"] for node in self.G.nodes]
-        x = np.sort(data)
+        coordinates = self._coordinates()
+        if coordinates is not None and coordinates.ndim != 1:
+            if d != self.d:
+                raise ValueError(
+                    "Для многомерных координат clique_number считается только "
+                    "при d графа."
+                )
+            return self._cached("clique", lambda: clique_number(self._csr()))
 
-        max_clique = 0
-        j = 0
-        n = len(x)
-        for i in range(n):
-            while j < n and x[j] - x[i] <= d:
-                j += 1
-            max_clique = max(max_clique, j - i)
-        return max_clique
+        # Наибольшее окно ширины d на отсортированных координатах узлов
+        x = self.sorted_coordinates()
+        if x is None:
+            raise ValueError("У вершин нет координат x.")
+        hi = sorted_windows(x, d)
+        return int((hi - np.arange(self.n)).max())
 
-    def max_independent_set(self, exact: bool = False, warn_threshold: int = 30) -> int:
+    def max_independent_set(
+        self,
+        exact: bool = False,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+    ) -> int:
         """
         Находит размер максимального независимого множества.
         Параметры:
-            exact - если True, использует точный метод, но медленный
-            warn_threshold - порог предупреждения для точного метода
+            exact - если True, использует точный метод ветвей и границ
+                (см. independent_set.py)
+            time_limit, node_limit - бюджет точного метода (секунды, узлы
+                дерева); при его исчерпании возвращается лучший найденный
+                размер и печатается предупреждение с верхней границей
+        Для графа интервалов ответ всегда точный (жадный проход).
         """
+        if self.interval is not None:
+            return self.interval.independence_number()
         if exact:
-            if self.n > warn_threshold:
-                print(f"[WARNING] Этот метод медленный для n > {warn_threshold}.")
-
-            # Точный поиск: клика в дополнении ↔️ независимое множество в
-            # оригинале
-            comp = nx.complement(self.G)
-            largest_clique = max(nx.find_cliques(comp), key=len)
-            return len(largest_clique)
+            result = self.exact_independent_set(time_limit, node_limit)
+            if not result.optimal:
+                print(
+                    f"[WARNING] Бюджет точного поиска исчерпан: "
+                    f"{result.size} <= α <= {result.upper_bound}."
+                )
+            return result.size
 
         else:
             # Быстрая аппроксимация
-            approx_set = (
-                nx.algorithms.approximation.independent_set.maximum_independent_set(
-                    self.G
-                )
-            )
+            approx_set = nx.approximation.maximum_independent_set(self.G)
             return len(approx_set)
 
+    def exact_independent_set(
+        self, time_limit: float | None = None, node_limit: int | None = None
+    ) -> IndependentSetResult:
+        """
+        Точное максимальное независимое множество на битовых строках
+        смежности без построения дополнения. Вершины в результате — метки
+        узлов графа; upper_bound — доказанная граница α.
+        """
+        key = ("independent_set", time_limit, node_limit)
+        return self._cached(key, lambda: self._independent_set(time_limit, node_limit))
+
+    def _independent_set(self, time_limit, node_limit) -> IndependentSetResult:
+        result = maximum_independent_set(self._csr(), time_limit, node_limit)
+        if self.csr is not None:
+            return result
+        labels = list(self.G.nodes)
+        return result._replace(nodes=np.array([labels[i] for i in result.nodes]))
+
+    def _csr(self) -> CSRGraph:
+        """CSR-представление графа (для nx.Graph строится один раз)."""
+        if self.csr is not None:
+            return self.csr
+        return self._cached("csr", lambda: CSRGraph.from_networkx(self.G))
+
     def dominating_number(self) -> int:
-        """Возвращает размер доминирующего множества, найденного приближенным методом."""
+        """Возвращает размер доминирующего множества, найденного приближенным методом.
+        Для графа интервалов возвращает точное доминирующее число."""
+        if self.interval is not None:
+            return self.interval.domination_number()
         dominating_set = nx.algorithms.dominating_set(self.G)
         return len(dominating_set)
 
@@ -92,10 +306,35 @@ class GraphAnalyzer:
         """
         Оценивает минимальное количество клик, необходимых для покрытия всех вершин графа.
         Реализация через раскраску дополнения графа (приближенно).
+        Для графа интервалов — точное значение θ = α.
         """
+        if self.interval is not None:
+            return self.interval.clique_cover_number()
         # Строим дополнение
-        comp = nx.complement(self.G)
+        comp = self.complement()
         # раскраска
         coloring = nx.greedy_color(comp, strategy="DSATUR")
         # Число цветов = размер покрытия кликами
         return max(coloring.values()) + 1  # получаем приближение
+
+    def summary(self, exact: bool = False) -> dict[str, int]:
+        """
+        Все метрики графа за один вызов с общими промежуточными величинами.
+
+        exact передаётся в max_independent_set. clique_number включается,
+        только если известны d и координаты вершин.
+        """
+        result = {
+            "max_degree": self.max_degree(),
+            "min_degree": self.min_degree(),
+            "connected_components": self.connected_components(),
+            "articulation_points": self.articulation_points(),
+            "count_triangles": self.count_triangles(),
+            "chromatic_number": self.chromatic_number(),
+        }
+        if self.d is not None and self._coordinates() is not None:
+            result["clique_number"] = self.clique_number()
+        result["max_independent_set"] = self.max_independent_set(exact=exact)
+        result["dominating_number"] = self.dominating_number()
+        result["min_clique_cover"] = self.min_clique_cover()
+        return result
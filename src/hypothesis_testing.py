@@ -1,12 +1,228 @@
 import numpy as np
+from scipy import stats
+
+from .monte_carlo import monte_carlo_simulation
+
+
+def _is_accumulator(stats) -> bool:
+    """Потоковый накопитель (streaming.StreamingQuantiles и аналоги)."""
+    return hasattr(stats, "exceedance")
+
+
+def _quantile(stats, q):
+    if _is_accumulator(stats):
+        return stats.quantile(q)
+    return np.quantile(stats, q)
+
+
+def _exceedance(stats, threshold):
+    """Доля значений stats строго больше threshold (порог может быть массивом)."""
+    if _is_accumulator(stats):
+        return stats.exceedance(threshold)
+    x = np.sort(np.asarray(stats).ravel())
+    above = x.shape[0] - np.searchsorted(x, threshold, side="right")
+    return above / x.shape[0]
+
+
+def _count(stats) -> int:
+    return stats.count if _is_accumulator(stats) else len(stats)
 
 
 def calculate_critical_region(h0_stats, alpha=0.05):
-    """Вычисляет критическую область."""
-    critical_value = np.quantile(h0_stats, 1 - alpha)
+    """
+    Вычисляет критическую область. h0_stats — массив значений или
+    потоковый накопитель (monte_carlo_simulation(accumulate=True)).
+    """
+    critical_value = _quantile(h0_stats, 1 - alpha)
     return (-np.inf, critical_value)
 
 
 def estimate_power(h1_stats, critical_value):
-    """Оценивает мощность критерия."""
+    """Оценивает мощность критерия (h1_stats — массив или накопитель)."""
+    if _is_accumulator(h1_stats):
+        return h1_stats.exceedance(critical_value)
     return np.mean(h1_stats > critical_value)
+
+
+def critical_values(h0_stats, alphas):
+    """Критические значения сразу для массива уровней значимости alphas."""
+    return _quantile(h0_stats, 1 - np.asarray(alphas, dtype=float))
+
+
+def power_curve(h0_stats, h1_stats, alphas):
+    """
+    Кривая мощности: для каждого alpha — критическое значение по H0 и
+    мощность по H1. Возвращает (critical, power) — массивы длины alphas.
+    """
+    critical = critical_values(h0_stats, alphas)
+    return critical, _exceedance(h1_stats, critical)
+
+
+def roc_curve(h0_stats, h1_stats):
+    """
+    ROC-кривая правостороннего критерия T > t по всем порогам t из
+    значений обеих выборок (или носителей накопителей). Возвращает
+    (fpr, tpr, thresholds); пороги убывают, fpr и tpr растут от 0 до 1.
+    """
+    supports = []
+    for sample in (h0_stats, h1_stats):
+        if _is_accumulator(sample):
+            supports.append(np.asarray(sample.support()[0], dtype=float))
+        else:
+            supports.append(np.asarray(sample, dtype=float).ravel())
+    values = np.unique(np.concatenate(supports))[::-1]
+    thresholds = np.concatenate([[np.inf], values, [-np.inf]])
+    return (
+        _exceedance(h0_stats, thresholds),
+        _exceedance(h1_stats, thresholds),
+        thresholds,
+    )
+
+
+def proportion_interval(successes, trials, confidence=0.95, method="wilson"):
+    """
+    Доверительный интервал для доли: method='wilson' (интервал Уилсона)
+    или 'clopper-pearson' (точный).
+    """
+    if method not in ("wilson", "clopper-pearson"):
+        raise ValueError("method должен быть 'wilson' или 'clopper-pearson'")
+    scipy_method = "exact" if method == "clopper-pearson" else "wilson"
+    ci = stats.binomtest(int(successes), int(trials)).proportion_ci(
+        confidence_level=confidence, method=scipy_method
+    )
+    return (ci.low, ci.high)
+
+
+def power_interval(h1_stats, critical_value, confidence=0.95, method="wilson"):
+    """
+    Оценка мощности и её доверительный интервал (см. proportion_interval);
+    h1_stats — массив или накопитель.
+    """
+    trials = _count(h1_stats)
+    successes = int(round(float(_exceedance(h1_stats, critical_value)) * trials))
+    power = successes / trials
+    return power, proportion_interval(successes, trials, confidence, method)
+
+
+def quantile_interval(sample, q, confidence=0.95):
+    """
+    Непараметрический доверительный интервал для квантиля уровня q по
+    порядковым статистикам: число наблюдений ниже квантиля ~ Bin(m, q).
+    """
+    x = np.sort(np.asarray(sample))
+    m = x.shape[0]
+    tail = (1 - confidence) / 2
+    lo = int(stats.binom.ppf(tail, m, q))
+    hi = int(stats.binom.ppf(1 - tail, m, q)) + 1
+    return (x[max(lo - 1, 0)], x[min(hi - 1, m - 1)])
+
+
+# точность критического значения по умолчанию для нецелых статистик:
+# доля стандартного отклонения статистики под H0
+_CRITICAL_TOL_SD = 0.05
+
+
+def sequential_power(
+    h0_distribution,
+    h0_params: dict,
+    h1_distribution,
+    h1_params: dict,
+    alpha: float = 0.05,
+    power_tol: float = 0.02,
+    critical_tol: float | None = None,
+    confidence: float = 0.95,
+    method: str = "wilson",
+    batch_size: int = 100,
+    max_samples: int = 10000,
+    seed=None,
+    **mc_kwargs,
+) -> dict:
+    """
+    Последовательный Монте-Карло: критическое значение и мощность с
+    остановкой по достигнутой точности.
+
+    Сначала повторения под H0 добавляются порциями (каждая следующая
+    равна уже набранному объёму, первая — batch_size), пока полуширина
+    доверительного интервала квантиля 1 - alpha (quantile_interval) не
+    станет <= critical_tol или не будет достигнут max_samples. По
+    умолчанию (None) для целочисленных статистик графа critical_tol=0 —
+    интервал сжался в одно значение, для нецелых — 0.05 стандартного
+    отклонения статистики под H0 (интервал квантиля непрерывной
+    величины в точку не сжимается, поэтому critical_tol=0 для них —
+    ValueError). Затем так же набираются повторения под H1,
+    пока полуширина интервала мощности (Уилсона или Клоппера–Пирсона) не
+    станет <= power_tol. При мощности около 0 или 1 интервал узкий уже
+    на первых порциях.
+
+    mc_kwargs передаются в monte_carlo_simulation (graph_type,
+    graph_param, metric, metric_args, n_jobs, ...); metric — одна
+    метрика, список метрик — ValueError. Каждая порция получает своё
+    зерно из SeedSequence(seed).
+
+    Возвращает словарь: critical_value, critical_interval, power,
+    power_interval, n_h0 и n_h1 (использованные повторения), converged
+    (достигнута ли точность), h0_stats, h1_stats.
+    """
+    if not isinstance(mc_kwargs.get("metric", "max_degree"), str):
+        raise ValueError(
+            "sequential_power работает с одной метрикой: передайте metric "
+            "строкой, а не списком."
+        )
+    root = np.random.SeedSequence(seed)
+    h0_seeds, h1_seeds = root.spawn(2)
+
+    def run(distribution, params, seeds, precise):
+        parts = []
+        total, size = 0, batch_size
+        while True:
+            size = min(size, max_samples - total)
+            (child,) = seeds.spawn(1)
+            parts.append(
+                monte_carlo_simulation(
+                    distribution, params, n_samples=size, seed=child, **mc_kwargs
+                )
+            )
+            total += size
+            sample = np.concatenate(parts)
+            if precise(sample):
+                return sample, True
+            if total >= max_samples:
+                return sample, False
+            size = total
+
+    tol = critical_tol
+
+    def critical_precise(sample):
+        nonlocal tol
+        if tol is None or tol == 0:
+            integer = bool(np.all(sample == np.round(sample)))
+            if tol == 0 and not integer:
+                raise ValueError(
+                    "critical_tol=0 достижимо только для целочисленных "
+                    "статистик; задайте положительную точность или None."
+                )
+            if tol is None:
+                tol = 0.0 if integer else _CRITICAL_TOL_SD * float(np.std(sample))
+        lo, hi = quantile_interval(sample, 1 - alpha, confidence)
+        return (hi - lo) / 2 <= tol
+
+    h0_stats, h0_done = run(h0_distribution, h0_params, h0_seeds, critical_precise)
+    critical_value = calculate_critical_region(h0_stats, alpha)[1]
+
+    def power_precise(sample):
+        _, (lo, hi) = power_interval(sample, critical_value, confidence, method)
+        return (hi - lo) / 2 <= power_tol
+
+    h1_stats, h1_done = run(h1_distribution, h1_params, h1_seeds, power_precise)
+    power, interval = power_interval(h1_stats, critical_value, confidence, method)
+    return {
+        "critical_value": critical_value,
+        "critical_interval": quantile_interval(h0_stats, 1 - alpha, confidence),
+        "power": power,
+        "power_interval": interval,
+        "n_h0": h0_stats.shape[0],
+        "n_h1": h1_stats.shape[0],
+        "converged": h0_done and h1_done,
+        "h0_stats": h0_stats,
+        "h1_stats": h1_stats,
+    }
@@ -0,0 +1,456 @@
+"""
+Дистанционный и KNN-граф одномерного потока наблюдений с обновлением
+на месте.
+
+Точки хранятся в sortedcontainers.SortedList по ключу (x, id), где id —
+номер поступления (растёт с каждым insert). insert(x) и remove(x)
+меняют только рёбра в окрестности точки, а метрики поддерживаются
+на ходу и читаются за O(1): max_degree, min_degree,
+connected_components, clique_number, count_triangles (те же имена, что
+у GraphAnalyzer).
+
+IncrementalDistanceGraph(d): для точки хранится число соседей справа w
+(как forward_counts у UnitIntervalGraph). Тогда треугольников
+Σ C(w, 2), клика — max w + 1, компонент — 1 + число промежутков между
+соседними точками больше d. Обновление — O(log n + степень точки).
+
+IncrementalKNNGraph(k): хранятся k ближайших каждой точки и обратные
+ссылки. Новая точка может войти в ближайшие только у точек не дальше
+k позиций от неё, удалённая — выйти только у точек из обратных ссылок;
+их списки пересчитываются, рёбра меняются по разнице. Компоненты KNN
+графа на прямой — отрезки подряд идущих точек, поэтому их число —
+1 + число промежутков, через которые не проходит ни одно ребро.
+Кликовое число — максимум по вершинам v наибольшей клики, в которой v
+самая левая; пересчитываются только вершины у изменённых рёбер.
+
+snapshot() отдаёт текущий граф в формате build_graph (по умолчанию
+CSRGraph) с вершинами в порядке поступления; для остальных метрик —
+analyzer().
+"""
+
+import heapq
+
+import numpy as np
+from sortedcontainers import SortedList
+
+from .build_graph import _check_output, _format_output, distance_graph_edges
+from .graph_analyzer import GraphAnalyzer
+from .independent_set import clique_size
+
+
+class _Multiset:
+    """Мультимножество целых с максимумом и минимумом за O(1)."""
+
+    def __init__(self):
+        self.counts = {}
+        self.size = 0
+        self.max = self.min = None
+
+    def add(self, value: int) -> None:
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.size += 1
+        if self.size == 1:
+            self.max = self.min = value
+        else:
+            self.max = max(self.max, value)
+            self.min = min(self.min, value)
+
+    def discard(self, value: int) -> None:
+        left = self.counts[value] - 1
+        if left:
+            self.counts[value] = left
+        else:
+            del self.counts[value]
+        self.size -= 1
+        if not self.size:
+            self.max = self.min = None
+            return
+        # значения меняются по соседству, поэтому сдвиг границ короткий
+        while self.max not in self.counts:
+            self.max -= 1
+        while self.min not in self.counts:
+            self.min += 1
+
+    def move(self, old: int, new: int) -> None:
+        self.add(new)
+        self.discard(old)
+
+
+class _StreamGraph:
+    """Общая часть: упорядоченные точки, степени, треугольники, снимок."""
+
+    def __init__(self):
+        self._keys = SortedList()  # (x, id)
+        self._x = {}  # id -> x, в порядке поступления
+        self._next_id = 0
+        self._degree = {}
+        self._degrees = _Multiset()
+        self._triangles = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _register(self, x: float) -> tuple[int, tuple[float, int], int]:
+        """Новая точка: id, ключ и её позиция после вставки."""
+        x = float(x)
+        v = self._next_id
+        self._next_id += 1
+        self._x[v] = x
+        key = (x, v)
+        self._keys.add(key)
+        self._degree[v] = 0
+        self._degrees.add(0)
+        return v, key, self._keys.index(key)
+
+    def _find(self, x: float) -> int:
+        """Позиция самой ранней точки с координатой x."""
+        x = float(x)
+        p = self._keys.bisect_left((x,))
+        if p == len(self._keys) or self._keys[p][0] != x:
+            raise ValueError(f"Точки {x} нет в графе.")
+        return p
+
+    def _forget(self, v: int, p: int) -> None:
+        del self._keys[p]
+        del self._x[v]
+        self._degrees.discard(self._degree.pop(v))
+
+    def _shift_degree(self, v: int, step: int) -> None:
+        degree = self._degree[v]
+        self._degree[v] = degree + step
+        self._degrees.move(degree, degree + step)
+
+    def _check_nonempty(self) -> None:
+        if not self._keys:
+            raise ValueError("Граф пуст")
+
+    def ids(self) -> np.ndarray:
+        """id точек в порядке вершин снимка (по возрастанию)."""
+        return np.fromiter(self._x, dtype=np.int64, count=len(self._x))
+
+    def coordinates(self) -> np.ndarray:
+        """Координаты точек в порядке вершин снимка."""
+        return np.fromiter(self._x.values(), dtype=float, count=len(self._x))
+
+    def max_degree(self) -> int:
+        self._check_nonempty()
+        return self._degrees.max
+
+    def min_degree(self) -> int:
+        self._check_nonempty()
+        return self._degrees.min
+
+    def count_triangles(self) -> int:
+        return self._triangles
+
+    def summary(self) -> dict[str, int]:
+        """Все поддерживаемые метрики текущего графа."""
+        return {
+            "max_degree": self.max_degree(),
+            "min_degree": self.min_degree(),
+            "connected_components": self.connected_components(),
+            "clique_number": self.clique_number(),
+            "count_triangles": self.count_triangles(),
+        }
+
+    def snapshot(self, output: str = "csr_graph"):
+        """
+        Текущий граф в формате output build_graph ('csr_graph', 'networkx',
+        'csr', 'edges'); вершина i — точка ids()[i].
+        """
+        _check_output(output)
+        return self._snapshot(output)
+
+    def analyzer(self) -> GraphAnalyzer:
+        """GraphAnalyzer по снимку — для метрик без обновления на месте."""
+        return GraphAnalyzer(self.snapshot())
+
+
+class IncrementalDistanceGraph(_StreamGraph):
+    """
+    Дистанционный граф с порогом d: ребро между точками, если
+    |x_i - x_j| <= d (тот же предикат, что и в build_distance_graph).
+    """
+
+    def __init__(self, d: float):
+        if d <= 0:
+            raise ValueError("Параметр d должен быть положительным.")
+        super().__init__()
+        self.d = float(d)
+        self._forward = {}  # id -> число соседей правее в порядке ключей
+        self._forwards = _Multiset()
+        self._wide_gaps = 0
+
+    def _window(self, p: int, x: float) -> tuple[int, int]:
+        """
+        Позиции [left, right) соседей точки p с координатой x (вместе с
+        ней): bisect по x ± d с поправкой на округление — граница
+        проверяется тем же выражением, что и в sorted_windows.
+        """
+        keys, d = self._keys, self.d
+        left = keys.bisect_left((x - d,))
+        while left > 0 and x - keys[left - 1][0] <= d:
+            left -= 1
+        while left < p and x - keys[left][0] > d:
+            left += 1
+        right = keys.bisect_right((x + d, np.inf))
+        while right > p + 1 and keys[right - 1][0] - x > d:
+            right -= 1
+        while right < len(keys) and keys[right][0] - x <= d:
+            right += 1
+        return left, right
+
+    def _wide_gaps_around(self, p: int, x: float) -> int:
+        """Вклад точки p в число промежутков > d (разница с её отсутствием)."""
+        keys, d = self._keys, self.d
+        has_left, has_right = p > 0, p + 1 < len(keys)
+        count = 0
+        if has_left:
+            count += x - keys[p - 1][0] > d
+        if has_right:
+            count += keys[p + 1][0] - x > d
+        if has_left and has_right:
+            count -= keys[p + 1][0] - keys[p - 1][0] > d
+        return count
+
+    def insert(self, x: float) -> int:
+        """Добавляет точку x, возвращает её id."""
+        v, _, p = self._register(x)
+        x = self._x[v]
+        left, right = self._window(p, x)
+        keys = self._keys
+        # окна точек слева теперь дотягиваются до x
+        for _, u in keys.islice(left, p):
+            w = self._forward[u]
+            self._forward[u] = w + 1
+            self._forwards.move(w, w + 1)
+            self._triangles += w
+            self._shift_degree(u, 1)
+        for _, u in keys.islice(p + 1, right):
+            self._shift_degree(u, 1)
+        w = right - p - 1
+        self._forward[v] = w
+        self._forwards.add(w)
+        self._triangles += w * (w - 1) // 2
+        self._shift_degree(v, right - left - 1)
+        self._wide_gaps += self._wide_gaps_around(p, x)
+        return v
+
+    def remove(self, x: float) -> int:
+        """
+        Удаляет самую раннюю точку с координатой x, возвращает её id.
+        ValueError, если такой точки нет.
+        """
+        p = self._find(x)
+        x, v = self._keys[p]
+        left, right = self._window(p, x)
+        keys = self._keys
+        for _, u in keys.islice(left, p):
+            w = self._forward[u] - 1
+            self._forward[u] = w
+            self._forwards.move(w + 1, w)
+            self._triangles -= w
+            self._shift_degree(u, -1)
+        for _, u in keys.islice(p + 1, right):
+            self._shift_degree(u, -1)
+        w = self._forward.pop(v)
+        self._forwards.discard(w)
+        self._triangles -= w * (w - 1) // 2
+        self._wide_gaps -= self._wide_gaps_around(p, x)
+        self._forget(v, p)
+        return v
+
+    def connected_components(self) -> int:
+        return self._wide_gaps + 1 if self._keys else 0
+
+    def clique_number(self) -> int:
+        self._check_nonempty()
+        return self._forwards.max + 1
+
+    def _snapshot(self, output: str):
+        x = self.coordinates()
+        rows, cols = distance_graph_edges(x, self.d) if x.shape[0] else ([], [])
+        rows, cols = np.asarray(rows, np.int64), np.asarray(cols, np.int64)
+        return _format_output(x, rows, cols, output, d=self.d)
+
+
+class IncrementalKNNGraph(_StreamGraph):
+    """
+    Симметризованный KNN-граф: ребро, если одна из точек среди k
+    ближайших к другой. Ближайшие — по (расстояние, id), как в
+    build_knn_graph по вершинам снимка (равные расстояния — в пользу
+    меньшего номера). Пока точек не больше k, каждая соединена со всеми.
+    """
+
+    def __init__(self, k: int):
+        if k <= 0:
+            raise ValueError("k должно быть положительным.")
+        super().__init__()
+        self.k = k
+        self._nearest = {}  # id -> множество id k ближайших
+        self._chosen_by = {}  # id -> у кого точка среди ближайших
+        self._adj = {}
+        # число рёбер над промежутком между точкой и следующей за ней
+        self._cover = {}
+        self._open_gaps = 0
+        self._clique = {}  # id -> наибольшая клика с самой левой вершиной id
+        self._cliques = _Multiset()
+
+    def _k_nearest(self, p: int) -> set[int]:
+        """
+        k ближайших к точке на позиции p. Слева при равных координатах
+        меньший id стоит дальше от p, поэтому окно продлевается на всю
+        серию совпадающих координат.
+        """
+        keys, k = self._keys, self.k
+        x = keys[p][0]
+        lo = max(p - k, 0)
+        while lo > 0 and keys[lo - 1][0] == keys[lo][0]:
+            lo -= 1
+        hi = min(p + k + 1, len(keys))
+        candidates = [(x - xu, u) for xu, u in keys.islice(lo, p)]
+        candidates += [(xu - x, u) for xu, u in keys.islice(p + 1, hi)]
+        return {u for _, u in heapq.nsmallest(k, candidates)}
+
+    def _span(self, u: int, w: int, step: int) -> None:
+        """Прибавляет step к покрытию промежутков между u и w."""
+        keys = self._keys
+        pu = keys.index((self._x[u], u))
+        pw = keys.index((self._x[w], w))
+        for _, g in keys.islice(min(pu, pw), max(pu, pw)):
+            cover = self._cover[g]
+            self._cover[g] = cover + step
+            if cover == 0:
+                self._open_gaps -= 1
+            elif cover + step == 0:
+                self._open_gaps += 1
+
+    def _add_edge(self, u: int, w: int, dirty: set) -> None:
+        common = self._adj[u] & self._adj[w]
+        self._triangles += len(common)
+        dirty |= common
+        dirty.update((u, w))
+        self._adj[u].add(w)
+        self._adj[w].add(u)
+        self._shift_degree(u, 1)
+        self._shift_degree(w, 1)
+        self._span(u, w, 1)
+
+    def _remove_edge(self, u: int, w: int, dirty: set) -> None:
+        self._adj[u].discard(w)
+        self._adj[w].discard(u)
+        common = self._adj[u] & self._adj[w]
+        self._triangles -= len(common)
+        dirty |= common
+        dirty.update((u, w))
+        self._shift_degree(u, -1)
+        self._shift_degree(w, -1)
+        self._span(u, w, -1)
+
+    def _renew(self, q: int, p: int, dirty: set) -> None:
+        """Пересчитывает ближайших точки q (позиция p) и рёбра по разнице."""
+        old = self._nearest[q]
+        new = self._k_nearest(p)
+        if new == old:
+            return
+        self._nearest[q] = new
+        for t in old - new:
+            self._chosen_by[t].discard(q)
+            if q not in self._nearest[t]:
+                self._remove_edge(q, t, dirty)
+        for t in new - old:
+            self._chosen_by[t].add(q)
+            if t not in self._adj[q]:
+                self._add_edge(q, t, dirty)
+
+    def _refresh_cliques(self, dirty: set) -> None:
+        """
+        Клики с самой левой вершиной v меняются, только если изменилось
+        ребро у v или между двумя её соседями, — такие v и собраны в dirty.
+        """
+        for v in dirty:
+            if v not in self._adj:
+                continue
+            key = (self._x[v], v)
+            right = [u for u in self._adj[v] if (self._x[u], u) > key]
+            index = {u: i for i, u in enumerate(right)}
+            rows = [
+                sum(1 << index[w] for w in self._adj[u] if w in index) for u in right
+            ]
+            size = 1 + clique_size(rows)
+            if size != self._clique[v]:
+                self._cliques.move(self._clique[v], size)
+                self._clique[v] = size
+
+    def insert(self, x: float) -> int:
+        """Добавляет точку x, возвращает её id."""
+        v, _, p = self._register(x)
+        keys = self._keys
+        self._adj[v] = set()
+        self._nearest[v] = set()
+        self._chosen_by[v] = set()
+        self._clique[v] = 1
+        self._cliques.add(1)
+        # промежуток, в который попала точка, делится на два с тем же покрытием
+        cover = 0
+        if 0 < p < len(keys) - 1:
+            cover = self._cover[keys[p - 1][1]]
+        self._cover[v] = cover
+        if len(keys) > 1 and cover == 0:
+            self._open_gaps += 1
+
+        # у новой точки наибольший id, она проигрывает все ничьи, поэтому
+        # войти в ближайшие может только у точек не дальше k позиций
+        dirty = set()
+        lo, hi = max(p - self.k, 0), min(p + self.k + 1, len(keys))
+        for position, (_, q) in zip(range(lo, hi), list(keys.islice(lo, hi))):
+            self._renew(q, position, dirty)
+        self._refresh_cliques(dirty)
+        return v
+
+    def remove(self, x: float) -> int:
+        """
+        Удаляет самую раннюю точку с координатой x, возвращает её id.
+        ValueError, если такой точки нет.
+        """
+        p = self._find(x)
+        v = self._keys[p][1]
+        dirty = set()
+        for t in list(self._adj[v]):
+            self._remove_edge(v, t, dirty)
+        for t in self._nearest.pop(v):
+            self._chosen_by[t].discard(v)
+        affected = self._chosen_by.pop(v)
+        for q in affected:
+            self._nearest[q].discard(v)
+
+        # рёбер у v больше нет: два её промежутка сливаются в один
+        if len(self._keys) > 1 and self._cover[v] == 0:
+            self._open_gaps -= 1
+        del self._cover[v]
+        del self._adj[v]
+        self._cliques.discard(self._clique.pop(v))
+        self._forget(v, p)
+
+        for q in affected:
+            self._renew(q, self._keys.index((self._x[q], q)), dirty)
+        self._refresh_cliques(dirty)
+        return v
+
+    def connected_components(self) -> int:
+        return self._open_gaps + 1 if self._keys else 0
+
+    def clique_number(self) -> int:
+        self._check_nonempty()
+        return self._cliques.max
+
+    def _snapshot(self, output: str):
+        ids = self.ids()
+        label = {v: i for i, v in enumerate(ids.tolist())}
+        edges = np.array(
+            [(label[u], label[w]) for u in label for w in self._adj[u] if u < w],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        order = np.lexsort((edges[:, 1], edges[:, 0]))
+        rows, cols = edges[order, 0], edges[order, 1]
+        return _format_output(self.coordinates(), rows, cols, output)
@@ -0,0 +1,317 @@
+"""
+Точное максимальное независимое множество методом ветвей и границ.
+
+Строки смежности упаковываются в битовые множества (целые числа Python),
+поиск ведётся прямо по исходному графу: независимое множество — клика
+дополнения, но дополнение не строится, кандидаты после выбора вершины v
+получаются как P & ~adj[v]. Верхняя граница в каждом узле дерева —
+жадное покрытие кандидатов кликами исходного графа (раскраска дополнения,
+как в MCQ/MCS Томиты), вершины перебираются в порядке убывания границы.
+Вершины CSRGraph перенумеровываются: по координатам x, если они есть
+(для графов из build_graph соседи тогда идут подряд и покрытие кликами
+почти точное), иначе в порядке вырождения (см. degeneracy_order).
+Компоненты связности решаются отдельно, вершины степени 0 и 1 забираются
+сразу (это не меняет ответ).
+
+При исчерпании бюджета (time_limit, node_limit) возвращается лучшее
+найденное множество и доказанная верхняя граница.
+"""
+
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .csr_graph import CSRGraph
+
+# строк плотной матрицы на один шаг упаковки в биты
+_PACK_ROWS = 1024
+
+
+class IndependentSetResult(NamedTuple):
+    """Найденное независимое множество и доказанная верхняя граница α."""
+
+    nodes: np.ndarray
+    upper_bound: int
+    optimal: bool
+
+    @property
+    def size(self) -> int:
+        return len(self.nodes)
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def adjacency_bitsets(g: CSRGraph) -> list[int]:
+    """Строки смежности CSRGraph как битовые множества: бит j в adj[i] — ребро."""
+    n = g.number_of_nodes()
+    adj = []
+    for start in range(0, n, _PACK_ROWS):
+        stop = min(start + _PACK_ROWS, n)
+        dense = np.zeros((stop - start, n), dtype=bool)
+        lo, hi = g.indptr[start], g.indptr[stop]
+        end = stop + 1
+        counts = np.diff(g.indptr[start:end])
+        rows = np.repeat(np.arange(stop - start), counts)
+        dense[rows, g.indices[lo:hi]] = True
+        packed = np.packbits(dense, axis=1, bitorder="little")
+        adj.extend(int.from_bytes(row.tobytes(), "little") for row in packed)
+    return adj
+
+
+def degeneracy_order(g: CSRGraph) -> np.ndarray:
+    """
+    Порядок вырождения: вершины в порядке удаления вершины наименьшей
+    текущей степени (корзины по степени, O(n + m)).
+    """
+    n = g.number_of_nodes()
+    deg = g.degrees().astype(np.int64).tolist()
+    indptr, indices = g.indptr.tolist(), g.indices.tolist()
+    buckets = [set() for _ in range(max(deg, default=0) + 1)]
+    for v, k in enumerate(deg):
+        buckets[k].add(v)
+    removed = [False] * n
+    order = []
+    low = 0
+    for _ in range(n):
+        low = max(low - 1, 0)
+        while not buckets[low]:
+            low += 1
+        v = buckets[low].pop()
+        removed[v] = True
+        order.append(v)
+        begin, end = indptr[v], indptr[v + 1]
+        for u in indices[begin:end]:
+            if not removed[u]:
+                buckets[deg[u]].discard(u)
+                deg[u] -= 1
+                buckets[deg[u]].add(u)
+    return np.array(order, dtype=np.int64)
+
+
+def _bits(mask: int):
+    """Номера единичных битов mask по возрастанию."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _components(adj: list[int], mask: int) -> list[int]:
+    """Компоненты связности подграфа на mask (каждая — битовое множество)."""
+    result = []
+    while mask:
+        comp = frontier = mask & -mask
+        while frontier:
+            reach = 0
+            for v in _bits(frontier):
+                reach |= adj[v]
+            frontier = reach & mask & ~comp
+            comp |= frontier
+        mask &= ~comp
+        result.append(comp)
+    return result
+
+
+def _reduce(adj: list[int], mask: int) -> tuple[list[int], int]:
+    """
+    Забирает вершины степени 0 и 1: изолированная вершина и висячая
+    вершина (вместо её соседа) входят в некоторое максимальное множество.
+    """
+    taken = []
+    changed = True
+    while changed:
+        changed = False
+        for v in _bits(mask):
+            if not mask >> v & 1:
+                continue
+            nbrs = adj[v] & mask
+            if nbrs & (nbrs - 1) == 0:
+                taken.append(v)
+                mask &= ~(nbrs | (1 << v))
+                changed = True
+    return taken, mask
+
+
+class _Search:
+    """Ветви и границы на одной компоненте."""
+
+    def __init__(self, adj, check):
+        self.adj = adj
+        self.check = check
+        self.best = []
+
+    def cover(self, P: int) -> tuple[list[int], list[int]]:
+        """
+        Жадное покрытие P кликами: вершины и номера их клик по возрастанию.
+        Любое независимое множество среди первых i вершин не больше bound[i].
+        """
+        adj = self.adj
+        order, bound = [], []
+        k = 0
+        while P:
+            k += 1
+            Q = P
+            while Q:
+                v = (Q & -Q).bit_length() - 1
+                # в ту же клику — только соседи v
+                Q &= adj[v]
+                P &= ~(1 << v)
+                order.append(v)
+                bound.append(k)
+        return order, bound
+
+    def expand(self, current: list[int], P: int) -> None:
+        self.check()
+        order, bound = self.cover(P)
+        for i in range(len(order) - 1, -1, -1):
+            if len(current) + bound[i] <= len(self.best):
+                return
+            v = order[i]
+            current.append(v)
+            Pv = P & ~self.adj[v] & ~(1 << v)
+            if Pv:
+                self.expand(current, Pv)
+            elif len(current) > len(self.best):
+                self.best = current.copy()
+            current.pop()
+            P &= ~(1 << v)
+
+    def run(self, P: int) -> int:
+        """
+        Поиск на P; возвращает доказанную верхнюю границу (при прерывании
+        бюджетом — граница корневой ветви, на которой остановились).
+        """
+        order, bound = self.cover(P)
+        current = []
+        for i in range(len(order) - 1, -1, -1):
+            if bound[i] <= len(self.best):
+                break
+            v = order[i]
+            current.append(v)
+            Pv = P & ~self.adj[v] & ~(1 << v)
+            try:
+                if Pv:
+                    self.expand(current, Pv)
+                elif len(current) > len(self.best):
+                    self.best = current.copy()
+            except _BudgetExceeded:
+                # законченные ветви исчерпаны, остальные ограничены bound[i]
+                return max(len(self.best), bound[i])
+            current.pop()
+            P &= ~(1 << v)
+        return len(self.best)
+
+
+def maximum_independent_set(
+    g: CSRGraph | list[int],
+    time_limit: float | None = None,
+    node_limit: int | None = None,
+) -> IndependentSetResult:
+    """
+    Максимальное независимое множество графа g (CSRGraph или список
+    битовых строк смежности adjacency_bitsets).
+
+    time_limit — секунды, node_limit — число узлов дерева поиска. Если
+    бюджет исчерпан, возвращается лучшее найденное множество, optimal=False
+    и upper_bound — доказанная верхняя граница α (для оставшихся компонент
+    — размер жадного покрытия кликами).
+    """
+    perm = None
+    if isinstance(g, CSRGraph):
+        if g.x is not None and np.ndim(g.x) == 1:
+            perm = np.argsort(g.x, kind="stable")
+        else:
+            perm = degeneracy_order(g)
+        inverse = np.empty_like(perm)
+        inverse[perm] = np.arange(perm.shape[0])
+        rows, cols = g.edges()
+        g = CSRGraph.from_edges(inverse[rows], inverse[cols], perm.shape[0])
+        adj = adjacency_bitsets(g)
+    else:
+        adj = g
+    n = len(adj)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    nodes = 0
+
+    def check():
+        nonlocal nodes
+        nodes += 1
+        if node_limit is not None and nodes > node_limit:
+            raise _BudgetExceeded
+        if deadline is not None and nodes % 64 == 0 and time.perf_counter() > deadline:
+            raise _BudgetExceeded
+
+    chosen, mask = _reduce(adj, (1 << n) - 1)
+    upper = len(chosen)
+    exhausted = False
+    for comp in _components(adj, mask):
+        search = _Search(adj, check)
+        if exhausted:
+            # бюджет закончился: жадное решение и граница покрытия
+            order, bound = search.cover(comp)
+            search.best = _greedy(adj, comp)
+            upper += bound[-1]
+        else:
+            bound = search.run(comp)
+            upper += bound
+            exhausted = bound > len(search.best)
+        chosen.extend(search.best)
+
+    chosen = np.array(chosen, dtype=np.int64)
+    if perm is not None:
+        chosen = perm[chosen]
+    return IndependentSetResult(np.sort(chosen), upper, upper == len(chosen))
+
+
+def clique_number(g: CSRGraph) -> int:
+    """
+    Точное кликовое число графа общего вида (без координат на прямой).
+
+    Вершины перенумеровываются в порядке вырождения; наибольшая клика с
+    первой вершиной v лежит среди её более поздних соседей S (их не больше
+    вырожденности графа), и её размер — 1 + α дополнения подграфа на S,
+    которое ищется maximum_independent_set. Соседства, в которых клика
+    больше найденной не поместится (|S| + 1 <= лучшего), пропускаются.
+    """
+    n = g.number_of_nodes()
+    if n == 0:
+        return 0
+    perm = degeneracy_order(g)
+    inverse = np.empty_like(perm)
+    inverse[perm] = np.arange(n)
+    rows, cols = g.edges()
+    adj = adjacency_bitsets(CSRGraph.from_edges(inverse[rows], inverse[cols], n))
+    best = 1
+    for v in range(n):
+        later = adj[v] >> (v + 1)
+        if later.bit_count() + 1 <= best:
+            continue
+        members = [v + 1 + i for i in _bits(later)]
+        local = []
+        for u in members:
+            row = adj[u] >> (v + 1)
+            local.append(
+                sum(1 << j for j, w in enumerate(members) if row >> (w - v - 1) & 1)
+            )
+        best = max(best, 1 + clique_size(local))
+    return best
+
+
+def clique_size(adj: list[int]) -> int:
+    """Кликовое число графа из битовых строк смежности: α его дополнения."""
+    full = (1 << len(adj)) - 1
+    complement = [full & ~row & ~(1 << i) for i, row in enumerate(adj)]
+    return maximum_independent_set(complement).size
+
+
+def _greedy(adj: list[int], P: int) -> list[int]:
+    """Жадное независимое множество: вершина наименьшей степени в P."""
+    chosen = []
+    while P:
+        v = min(_bits(P), key=lambda u: (adj[u] & P).bit_count())
+        chosen.append(v)
+        P &= ~adj[v] & ~(1 << v)
+    return chosen
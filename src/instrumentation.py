@@ -0,0 +1,173 @@
+"""
+Инструментирование Монте-Карло: время по этапам, счётчики и прогресс.
+
+Profiler копит по каждому этапу (генерация выборок, построение графа,
+каждая метрика, пакетный расчёт) число вызовов, суммарное время по
+часам (perf_counter) и процессорное время (process_time), а также
+счётчики: число повторений, построенных графов, вершин и рёбер.
+Профилировщики порций из процессов пула объединяются merge(). Итог
+выгружается в JSON (to_json) или в файл статистики в формате pstats
+(dump_stats; открывается pstats.Stats, snakeviz и т. п.).
+
+Выключенный профилировщик (DISABLED, используется по умолчанию) не
+делает ничего: stage() возвращает один и тот же пустой контекст, так
+что накладные расходы — один вызов метода на этап.
+"""
+
+import cProfile
+import json
+import marshal
+import time
+from contextlib import contextmanager, nullcontext
+
+_NULL = nullcontext()
+
+
+class Profiler:
+    """
+    Накопитель времени по этапам и счётчиков.
+
+    callback(info) вызывается после каждой законченной порции повторений;
+    info — словарь done, total (повторения), elapsed (секунды), rate
+    (повторений в секунду), eta (оценка оставшегося времени, секунды),
+    graphs_per_second. cprofile=True дополнительно включает cProfile на
+    время запуска в основном процессе; dump_stats тогда пишет его данные.
+    """
+
+    def __init__(self, callback=None, cprofile: bool = False, enabled: bool = True):
+        self.enabled = enabled
+        self.callback = callback
+        self.stages = {}  # имя -> [вызовы, wall, cpu]
+        self.counters = {}
+        self.profile = cProfile.Profile() if cprofile else None
+        self._start = None
+        self._total = None
+
+    def stage(self, name: str):
+        """Контекст, время которого прибавляется к этапу name."""
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - wall
+            entry[2] += time.process_time() - cpu
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def count_graph(self, graph) -> None:
+        """Учитывает построенный граф (CSRGraph или nx.Graph)."""
+        if self.enabled:
+            self.count("graphs")
+            self.count("nodes", graph.number_of_nodes())
+            self.count("edges", graph.number_of_edges())
+
+    def merge(self, other: "Profiler") -> "Profiler":
+        """Прибавляет этапы и счётчики other (например, порции из пула)."""
+        for name, (calls, wall, cpu) in other.stages.items():
+            entry = self.stages.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += wall
+            entry[2] += cpu
+        for name, value in other.counters.items():
+            self.count(name, value)
+        return self
+
+    @contextmanager
+    def run(self, total: int):
+        """Весь запуск: отсчёт прогресса и (если включён) cProfile."""
+        if not self.enabled:
+            yield
+            return
+        self._start, self._total = time.perf_counter(), total
+        if self.profile is not None:
+            self.profile.enable()
+        try:
+            with self.stage("total"):
+                yield
+        finally:
+            if self.profile is not None:
+                self.profile.disable()
+
+    def progress(self, done: int) -> None:
+        """Сообщает callback, что закончено done повторений из total."""
+        if not self.enabled or self.callback is None:
+            return
+        elapsed = time.perf_counter() - self._start
+        rate = done / elapsed if elapsed > 0 else float("inf")
+        left = self._total - done
+        self.callback(
+            {
+                "done": done,
+                "total": self._total,
+                "elapsed": elapsed,
+                "rate": rate,
+                "eta": left / rate if rate > 0 else float("inf"),
+                "graphs_per_second": (
+                    self.counters.get("graphs", 0) / elapsed
+                    if elapsed > 0
+                    else float("inf")
+                ),
+            }
+        )
+
+    def to_dict(self) -> dict:
+        """Этапы {имя: calls, wall, cpu} и счётчики."""
+        return {
+            "stages": {
+                name: {"calls": calls, "wall": wall, "cpu": cpu}
+                for name, (calls, wall, cpu) in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def to_json(self, path=None) -> str:
+        text = json.dumps(self.to_dict(), indent=1)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def dump_stats(self, path) -> None:
+        """
+        Файл в формате pstats: данные cProfile, если он был включён,
+        иначе этапы как функции ("monte_carlo", 0, имя этапа) с временем
+        по часам, вызванные из этапа total.
+        """
+        if self.profile is not None:
+            self.profile.dump_stats(path)
+            return
+        root = ("monte_carlo", 0, "total")
+        stats = {}
+        for name, (calls, wall, _) in self.stages.items():
+            if name == "total":
+                continue
+            callers = {root: (calls, calls, wall, wall)}
+            stats[("monte_carlo", 0, name)] = (calls, calls, wall, wall, callers)
+        inner = sum(entry[2] for entry in stats.values())
+        calls, wall, _ = self.stages.get("total", [1, inner, 0.0])
+        stats[root] = (calls, calls, max(wall - inner, 0.0), wall, {})
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+    def report(self) -> str:
+        """Таблица этапов по убыванию времени и счётчики."""
+        lines = [f"{'stage':32s} {'calls':>8s} {'wall, s':>10s} {'cpu, s':>10s}"]
+        ordered = sorted(self.stages.items(), key=lambda item: -item[1][1])
+        for name, (calls, wall, cpu) in ordered:
+            lines.append(f"{name:32s} {calls:8d} {wall:10.4f} {cpu:10.4f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+
+DISABLED = Profiler(enabled=False)
@@ -0,0 +1,101 @@
+"""
+Точные алгоритмы для одномерных дистанционных графов.
+
+Дистанционный граф на прямой — граф единичных интервалов: вершина x
+соответствует отрезку [x, x + d], рёбра — пересечениям. Для таких графов
+клики, раскраска, независимые и доминирующие множества находятся точно
+одним проходом по отсортированным координатам за O(n log n).
+"""
+
+import numpy as np
+
+from .build_graph import _as_1d, distance_windows
+
+
+class UnitIntervalGraph:
+    """
+    Отсортированные координаты xs и окна hi дистанционного графа с параметром d.
+
+    Для позиции p соседи справа — позиции p+1..hi[p]-1 (см. distance_windows),
+    поэтому все величины ниже совпадают с графом из build_distance_graph.
+    """
+
+    __slots__ = ("xs", "hi", "d")
+
+    def __init__(self, x: np.ndarray, d: float):
+        if d <= 0:
+            raise ValueError("Параметр d должен быть положительным.")
+        _, self.xs, self.hi = distance_windows(_as_1d(x), d)
+        self.d = d
+
+    def __len__(self) -> int:
+        return self.xs.shape[0]
+
+    def degrees(self) -> np.ndarray:
+        """Степени вершин в порядке сортировки координат."""
+        pos = np.arange(len(self))
+        # число вершин слева, чьё окно не дотягивается до p
+        before = np.searchsorted(self.hi, pos, side="right")
+        return self.hi - 1 - before
+
+    def forward_counts(self) -> np.ndarray:
+        """Число соседей справа от каждой вершины."""
+        return self.hi - np.arange(len(self)) - 1
+
+    def connected_components(self) -> int:
+        """Компоненты разделяются промежутками между соседними точками > d."""
+        if len(self) == 0:
+            return 0
+        return 1 + int(np.count_nonzero(np.diff(self.xs) > self.d))
+
+    def articulation_points(self) -> int:
+        """
+        Вершина p — точка сочленения, если она связана с обоими соседями
+        по порядку, а сами они между собой не связаны.
+        """
+        xs, d = self.xs, self.d
+        if len(self) < 3:
+            return 0
+        gaps = np.diff(xs)
+        joined = (gaps[:-1] <= d) & (gaps[1:] <= d)
+        return int(np.count_nonzero(joined & (xs[2:] - xs[:-2] > d)))
+
+    def count_triangles(self) -> int:
+        """Треугольник с левой вершиной p — любая пара из её правого окна."""
+        w = self.forward_counts()
+        return int(np.sum(w * (w - 1) // 2))
+
+    def clique_number(self) -> int:
+        """Наибольшее число точек в окне ширины d."""
+        if len(self) == 0:
+            return 0
+        return int(self.forward_counts().max()) + 1
+
+    def chromatic_number(self) -> int:
+        """Графы интервалов совершенны: χ = ω."""
+        return self.clique_number()
+
+    def independence_number(self) -> int:
+        """Жадный выбор самой левой точки и пропуск её окна — точный ответ."""
+        count, p, n = 0, 0, len(self)
+        hi = self.hi
+        while p < n:
+            count += 1
+            p = hi[p]
+        return count
+
+    def clique_cover_number(self) -> int:
+        """Дополнение графа интервалов совершенно: θ = α."""
+        return self.independence_number()
+
+    def domination_number(self) -> int:
+        """
+        Самую левую недоминированную точку p доминирует самая правая
+        точка её окна q = hi[p] - 1; следующая недоминированная — hi[q].
+        """
+        count, p, n = 0, 0, len(self)
+        hi = self.hi
+        while p < n:
+            count += 1
+            p = hi[hi[p] - 1]
+        return count
@@ -2,9 +2,189 @@
 Функции для проведения Monte Carlo экспериментов и критической области.
 """
 
+import itertools
+import os
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
+from . import batch_statistics
 from .build_graph import build_knn_graph, build_distance_graph
+from .distribution_generators import BATCH_SAMPLERS
 from .graph_analyzer import GraphAnalyzer
+from .instrumentation import DISABLED, Profiler
+from .result_cache import ResultCache, cache_key
+from .streaming import StreamingQuantiles
+
+
+def _build_graph(data: np.ndarray, graph_type: str, graph_param: float | int):
+    """Строит граф заданного типа в компактном формате CSRGraph."""
+    if graph_type == "knn":
+        return build_knn_graph(data, graph_param, output="csr_graph")
+    if graph_type == "distance":
+        return build_distance_graph(data, graph_param, output="csr_graph")
+    raise ValueError("graph_type должен быть 'knn' или 'distance'")
+
+
+def _statistic_loop(
+    samples, graph_type, graph_param, metrics, profiler=DISABLED
+) -> dict:
+    """
+    Поэлементный расчёт: на каждое повторение один граф и один
+    GraphAnalyzer, из которых считаются все запрошенные метрики.
+    """
+    T = {metric: [] for metric in metrics}
+    stages = {metric: "metric:" + metric for metric in metrics}
+    for data in samples:
+        # создаем граф
+        with profiler.stage("build"):
+            A = _build_graph(data, graph_type, graph_param)
+        profiler.count_graph(A)
+        # анализируем
+        ga = GraphAnalyzer(A)
+        for metric, metric_args in metrics.items():
+            with profiler.stage(stages[metric]):
+                T[metric].append(getattr(ga, metric)(**metric_args))
+    return {metric: np.array(values) for metric, values in T.items()}
+
+
+def _statistics(
+    samples, graph_type, graph_param, metrics, batched, profiler=DISABLED
+) -> dict:
+    """
+    Статистики по списку выборок: метрики с пакетной реализацией считаются
+    по всей матрице сразу (этап "batched": графы не строятся, поэтому
+    вершины и рёбра не учитываются), остальные — поэлементно за один проход.
+    """
+    columns = {}
+    batch = {}
+    # пакетные статистики — только для одномерных выборок
+    if batched and samples and np.shape(samples[0])[1:] in ((), (1,)):
+        batch = {
+            metric: metric_args
+            for metric, metric_args in metrics.items()
+            if batch_statistics.supports(graph_type, metric)
+        }
+    if batch:
+        with profiler.stage("batched"):
+            X = np.stack(
+                [np.asarray(data, dtype=float).reshape(-1) for data in samples]
+            )
+            columns.update(
+                batch_statistics.batched_statistics(X, graph_type, graph_param, batch)
+            )
+        profiler.count("batched_rows", X.shape[0])
+    rest = {metric: args for metric, args in metrics.items() if metric not in batch}
+    if rest:
+        columns.update(
+            _statistic_loop(samples, graph_type, graph_param, rest, profiler)
+        )
+    return {metric: columns[metric] for metric in metrics}
+
+
+def normalize_metrics(metric, metric_args) -> dict[str, dict]:
+    """
+    Приводит metric/metric_args к словарю {имя метрики: аргументы}.
+
+    Для одной метрики metric_args — её аргументы; для списка метрик —
+    словарь {имя метрики: аргументы}, отсутствующие метрики без аргументов.
+    """
+    if isinstance(metric, str):
+        metrics = {metric: dict(metric_args or {})}
+    else:
+        metric_args = metric_args or {}
+        unknown = set(metric_args) - set(metric)
+        if unknown:
+            raise ValueError(
+                f"metric_args для списка метрик задаются по именам метрик, "
+                f"лишние ключи: {sorted(unknown)}"
+            )
+        metrics = {name: dict(metric_args.get(name, {})) for name in metric}
+    for name in metrics:
+        if not hasattr(GraphAnalyzer, name):
+            raise ValueError(f"Метрика {name} не найдена в GraphAnalyzer")
+    return metrics
+
+
+def _to_structured(columns: dict[str, np.ndarray], n_samples: int) -> np.ndarray:
+    """Структурированный массив с полем на каждую метрику."""
+    dtype = [(metric, values.dtype) for metric, values in columns.items()]
+    result = np.empty(n_samples, dtype=dtype)
+    for metric, values in columns.items():
+        result[metric] = values
+    return result
+
+
+# Порция повторений на одну задачу пула: не меньше _MIN_CHUNK, чтобы
+# окупить передачу задачи в процесс, и не больше _MAX_CHUNKS порций.
+_MIN_CHUNK = 16
+_MAX_CHUNKS = 256
+
+
+def _default_chunk_size(n_samples: int) -> int:
+    return max(_MIN_CHUNK, -(-n_samples // _MAX_CHUNKS))
+
+
+def _chunk_sizes(n_samples: int, chunk_size: int) -> list[int]:
+    full, rest = divmod(n_samples, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def simulate_chunk(
+    count: int,
+    seed: np.random.SeedSequence,
+    distribution,
+    params: dict,
+    graph_type: str,
+    graph_param: float | int,
+    metrics: dict,
+    batched: bool,
+    accumulate: bool = False,
+    instrument: bool = False,
+) -> dict | tuple[dict, Profiler]:
+    """
+    Одна порция из count повторений со своим генератором
+    np.random.default_rng(seed) — единица работы monte_carlo_simulation
+    (выполняется в процессе пула) и build_feature_dataset.
+
+    metrics — словарь {метрика: аргументы} из normalize_metrics.
+    Возвращает {метрика: массив значений длины count}; при
+    accumulate=True вместо значений — накопители StreamingQuantiles,
+    при instrument=True — пару (результат, Profiler порции).
+    """
+    profiler = Profiler() if instrument else DISABLED
+    rng = np.random.default_rng(seed)
+    with profiler.stage("generate"):
+        samples = _draw_samples(distribution, params, count, rng)
+    columns = _statistics(samples, graph_type, graph_param, metrics, batched, profiler)
+    if accumulate:
+        # скетчи KLL прореживаются случайно: зерно — из зерна порции
+        seeds = seed.spawn(len(columns))
+        columns = {
+            metric: StreamingQuantiles(seed=child).update(values)
+            for (metric, values), child in zip(columns.items(), seeds)
+        }
+    return (columns, profiler) if instrument else columns
+
+
+def _draw_samples(distribution, params: dict, count: int, rng) -> list:
+    """count выборок distribution(**params) из генератора rng."""
+    sampler = BATCH_SAMPLERS.get(distribution)
+    if sampler is not None and "n" in params:
+        # вся порция одной матрицей (count, n) без промежуточных массивов
+        args = {key: value for key, value in params.items() if key != "n"}
+        return list(sampler(rng, size=(count, params["n"]), **args))
+    return [distribution(**params, rng=rng) for _ in range(count)]
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """Число процессов: None и 0 — один, отрицательное — как в joblib."""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
 
 
 def monte_carlo_simulation(
@@ -13,9 +193,17 @@ def monte_carlo_simulation(
     n_samples: int = 1000,
     graph_type: str = "knn",
     graph_param: float | int = 3,  # k для KNN, d для дистанционного
-    metric: str = "max_degree",  # метод GraphAnalyzer: max_degree или chromatic_number
-    metric_args: dict = None,  # дополнительные аргументы для метода
+    metric: str | list[str] = "max_degree",  # метод(ы) GraphAnalyzer
+    metric_args: dict = None,  # дополнительные аргументы для метода(ов)
     n: int = 100,
+    batched: bool = True,
+    seed: int | np.random.SeedSequence | None = None,
+    n_jobs: int = 1,
+    executor: Executor | None = None,
+    chunk_size: int | None = None,
+    cache: str | os.PathLike | ResultCache | None = None,
+    accumulate: bool = False,
+    profiler: Profiler | None = None,
 ) -> np.ndarray:
     """
     Выполняет Монте-Карло симуляцию для оценки распределения статистики графа.
@@ -30,33 +218,347 @@ def monte_carlo_simulation(
         Число повторений симуляции
     graph_type : {'knn','distance'}
     graph_param : float or int
-    metric : {'max_degree','chromatic_number'}
+    metric : str or list of str
+        Метод GraphAnalyzer ('max_degree', 'chromatic_number', ...) или
+        список методов: тогда одна выборка и один граф на повторение
+        используются для всех метрик.
     metric_args : dict
+        Аргументы метода; для списка метрик — {имя метрики: аргументы},
+        например {"clique_number": {"d": 1.0}}.
     n : размер выборки
+    batched : bool
+        Если для метрики есть пакетная реализация (batch_statistics),
+        повторения собираются в матрицу (n_samples, n) и статистика
+        считается по всем строкам сразу. Остальные метрики считаются
+        поэлементно. Результат в обоих случаях одинаков.
+    seed : int or np.random.SeedSequence, optional
+        Зерно воспроизводимого запуска. Повторения делятся на порции по
+        chunk_size, каждая порция получает свой np.random.Generator из
+        SeedSequence(seed).spawn(...), генератор передаётся в distribution
+        аргументом rng. Результат зависит только от seed и chunk_size,
+        но не от числа процессов.
+    n_jobs : int
+        Число процессов (ProcessPoolExecutor); -1 — все ядра. При n_jobs=1,
+        без seed и executor используется глобальное состояние np.random,
+        как раньше.
+    executor : concurrent.futures.Executor, optional
+        Готовый пул для порций (например, общий на серию вызовов).
+        distribution должна быть функцией уровня модуля, чтобы её можно
+        было передать в процесс.
+    chunk_size : int, optional
+        Размер порции; по умолчанию не меньше 16 и не больше 256 порций.
+    cache : str, os.PathLike or ResultCache, optional
+        Каталог кэша результатов (см. result_cache.py), только вместе с
+        seed. Ключ — хэш всех параметров запуска; готовый результат
+        читается с диска как memmap, а каждая законченная порция
+        сохраняется, так что прерванный запуск продолжается с неё.
+    accumulate : bool
+        Не хранить значения: каждая порция сворачивается в потоковый
+        накопитель (streaming.StreamingQuantiles — точная гистограмма для
+        целых значений, скетч KLL для прочих) прямо в процессе пула,
+        накопители объединяются по мере готовности. Память не зависит от
+        n_samples; всегда используется путь с порциями. Случайное
+        прореживание скетчей берёт зерна из seed, поэтому результат с тем
+        же seed воспроизводим.
+    profiler : instrumentation.Profiler, optional
+        Копит время по этапам ("generate", "build", "metric:<имя>",
+        "batched", "total"; по часам и процессорное) и счётчики
+        (samples, graphs, nodes, edges), в том числе из процессов пула;
+        его callback получает прогресс и скорость после каждой порции.
+        Без него инструментирование выключено.
 
     Возвращает:
     -------
     np.ndarray
-        Массив значений статистики длины n_samples
+        Массив значений статистики длины n_samples; для списка метрик —
+        структурированный массив с полем на каждую метрику
+        (pd.DataFrame(result) даёт таблицу). При accumulate=True —
+        StreamingQuantiles (для списка метрик — словарь {метрика:
+        накопитель}), их принимают функции hypothesis_testing.
     """
-    if metric_args is None:
-        metric_args = {}
+    if graph_type not in ("knn", "distance"):
+        raise ValueError("graph_type должен быть 'knn' или 'distance'")
+    metrics = normalize_metrics(metric, metric_args)
 
-    T = []
-    for _ in range(n_samples):
-        # генерируем данные
-        data = distribution(**params)
-        # создаем граф
-        if graph_type == "knn":
-            A = build_knn_graph(data.reshape(-1, 1), graph_param)
-        elif graph_type == "distance":
-            A = build_distance_graph(data, graph_param)
-        else:
-            raise ValueError("graph_type должен быть 'knn' или 'distance'")
-        # анализируем
-        ga = GraphAnalyzer(A)
-        if not hasattr(ga, metric):
-            raise ValueError(f"Метрика {metric} не найдена в GraphAnalyzer")
-        stat = getattr(ga, metric)(**metric_args)
-        T.append(stat)
-    return np.array(T)
+    checkpoints = None
+    if cache is not None and accumulate:
+        raise ValueError("cache и accumulate нельзя использовать вместе.")
+    if cache is not None:
+        if seed is None:
+            raise ValueError("Кэш результатов используется только вместе с seed.")
+        if chunk_size is None:
+            chunk_size = _default_chunk_size(n_samples)
+        if not isinstance(cache, ResultCache):
+            cache = ResultCache(cache)
+        fields = dict(
+            distribution=distribution,
+            params=params,
+            graph_type=graph_type,
+            graph_param=graph_param,
+            metric=metric,
+            metric_args=metric_args,
+            n=n,
+            n_samples=n_samples,
+            seed=seed,
+            chunk_size=chunk_size,
+        )
+        key = cache_key(**fields)
+        result = cache.load(key)
+        if result is not None:
+            return result
+        checkpoints = (cache, key)
+
+    if profiler is None:
+        profiler = DISABLED
+    with profiler.run(n_samples):
+        columns = _simulate(
+            distribution,
+            params,
+            n_samples,
+            graph_type,
+            graph_param,
+            metrics,
+            batched,
+            seed,
+            n_jobs,
+            executor,
+            chunk_size,
+            checkpoints,
+            accumulate,
+            profiler,
+        )
+    if accumulate:
+        return columns[metric] if isinstance(metric, str) else columns
+    if isinstance(metric, str):
+        result = columns[metric]
+    else:
+        result = _to_structured(columns, n_samples)
+    if checkpoints is not None:
+        result = cache.store(key, result, fields)
+    return result
+
+
+def _simulate(
+    distribution,
+    params,
+    n_samples,
+    graph_type,
+    graph_param,
+    metrics,
+    batched,
+    seed,
+    n_jobs,
+    executor,
+    chunk_size,
+    checkpoints=None,
+    accumulate=False,
+    profiler=DISABLED,
+) -> dict[str, np.ndarray]:
+    """
+    Столбцы значений метрик (см. monte_carlo_simulation). checkpoints —
+    пара (ResultCache, ключ): готовые порции берутся из кэша, новые
+    сохраняются по мере завершения. При accumulate — накопители метрик.
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    legacy = seed is None and n_jobs == 1 and executor is None
+    if legacy and not accumulate:
+        # генерируем данные в том же порядке, что и поэлементный цикл
+        with profiler.stage("generate"):
+            samples = [distribution(**params) for _ in range(n_samples)]
+        if not profiler.enabled:
+            return _statistics(samples, graph_type, graph_param, metrics, batched)
+        # с профилировщиком статистики считаются порциями, чтобы callback
+        # получал прогресс по ходу расчёта, а не один раз в конце
+        if chunk_size is None:
+            chunk_size = _default_chunk_size(n_samples)
+        parts = []
+        for start in range(0, n_samples, chunk_size):
+            stop = min(start + chunk_size, n_samples)
+            block = samples[start:stop]
+            parts.append(
+                _statistics(block, graph_type, graph_param, metrics, batched, profiler)
+            )
+            profiler.count("samples", len(block))
+            profiler.progress(stop)
+        if not parts:
+            return {metric: np.array([]) for metric in metrics}
+        return {
+            metric: np.concatenate([part[metric] for part in parts])
+            for metric in metrics
+        }
+
+    if chunk_size is None:
+        chunk_size = _default_chunk_size(n_samples)
+    sizes = _chunk_sizes(n_samples, chunk_size)
+    if isinstance(seed, np.random.SeedSequence):
+        root = seed
+    else:
+        root = np.random.SeedSequence(seed)
+    # последний потомок — зерна накопителей, в которые сливаются порции
+    *children, merge_seed = root.spawn(len(sizes) + 1)
+    job = partial(
+        simulate_chunk,
+        distribution=distribution,
+        params=params,
+        graph_type=graph_type,
+        graph_param=graph_param,
+        metrics=metrics,
+        batched=batched,
+        accumulate=accumulate,
+        instrument=profiler.enabled,
+    )
+
+    done = {}
+    if checkpoints is not None:
+        store, key = checkpoints
+        for index, chunk in store.load_chunks(key).items():
+            done[index] = {metric: chunk[metric] for metric in metrics}
+    todo = [index for index in range(len(sizes)) if index not in done]
+    todo_sizes = [sizes[index] for index in todo]
+    todo_children = [children[index] for index in todo]
+
+    merged = {
+        metric: StreamingQuantiles(seed=child)
+        for metric, child in zip(metrics, merge_seed.spawn(len(metrics)))
+    }
+    finished = sum(sizes[index] for index in done)
+
+    def collect(results):
+        nonlocal finished
+        for index, columns in zip(todo, results):
+            if profiler.enabled:
+                columns, part = columns
+                profiler.merge(part)
+                profiler.count("samples", sizes[index])
+                finished += sizes[index]
+                profiler.progress(finished)
+            if accumulate:
+                for metric, accumulator in columns.items():
+                    merged[metric].merge(accumulator)
+                continue
+            if checkpoints is not None:
+                store.store_chunk(key, index, _to_structured(columns, sizes[index]))
+            done[index] = columns
+
+    if executor is not None:
+        collect(executor.map(job, todo_sizes, todo_children))
+    elif n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            collect(pool.map(job, todo_sizes, todo_children))
+    else:
+        collect(map(job, todo_sizes, todo_children))
+
+    if accumulate:
+        return merged
+    chunks = [done[index] for index in range(len(sizes))]
+    if not chunks:
+        return {metric: np.array([]) for metric in metrics}
+    return {
+        metric: np.concatenate([chunk[metric] for chunk in chunks])
+        for metric in metrics
+    }
+
+
+def sweep(
+    distribution,
+    grid: dict,  # параметры distribution: значение или список значений
+    graph_type: str = "knn",
+    graph_params=(3,),  # значения k для KNN или d для дистанционного
+    metric: str | list[str] = "max_degree",
+    metric_args: dict = None,
+    n_samples: int = 1000,
+    batched: bool = True,
+    seed: int | np.random.SeedSequence | None = None,
+) -> pd.DataFrame:
+    """
+    Монте-Карло по сетке параметров с общими случайными числами.
+
+    Параметры:
+    ------------
+    grid : dict
+        Параметры distribution, например {"nu": [3, 5], "n": [50, 100]};
+        значение-скаляр — один узел сетки. Ключ "n" обязателен.
+    graph_params : список k или d
+    metric, metric_args : как в monte_carlo_simulation
+    seed : int or np.random.SeedSequence, optional
+        Каждый узел сетки параметров распределения получает генератор из
+        одного и того же SeedSequence(seed) (общие случайные числа).
+
+    Для каждого узла сетки параметров распределения выборки генерируются
+    один раз матрицей (n_samples, max n): выборки меньшего размера — её
+    первые n столбцов, и все графовые параметры считаются по тем же
+    данным. Дистанционные графы вложены по d, поэтому строки сортируются
+    один раз, а окна для большего d ищутся от окон меньшего; для KNN
+    соседи ищутся один раз при наибольшем k (см. batch_statistics.
+    batched_sweep). Метрики без пакетной реализации считаются
+    поэлементно по тем же выборкам. Общие данные уменьшают дисперсию
+    разностей между соседними узлами сетки.
+
+    Возвращает:
+    -------
+    pd.DataFrame
+        Длинная таблица: столбцы параметров сетки, 'k' или 'd',
+        'metric', 'replicate', 'value' — строка на каждое повторение.
+    """
+    if graph_type not in ("knn", "distance"):
+        raise ValueError("graph_type должен быть 'knn' или 'distance'")
+    if "n" not in grid:
+        raise ValueError("В grid должен быть задан размер выборки 'n'.")
+    metrics = normalize_metrics(metric, metric_args)
+    grid = {
+        key: list(value) if np.ndim(value) else [value] for key, value in grid.items()
+    }
+    n_values = sorted(grid.pop("n"))
+    graph_params = sorted(set(graph_params))
+    param_name = "k" if graph_type == "knn" else "d"
+    if isinstance(seed, np.random.SeedSequence):
+        root = seed
+    else:
+        root = np.random.SeedSequence(seed)
+
+    batch = {}
+    if batched:
+        batch = {
+            name: args
+            for name, args in metrics.items()
+            if batch_statistics.supports(graph_type, name)
+        }
+    rest = {name: args for name, args in metrics.items() if name not in batch}
+
+    frames = []
+    for values in itertools.product(*grid.values()):
+        params = dict(zip(grid, values))
+        rng = np.random.default_rng(root)
+        samples = _draw_samples(
+            distribution, {**params, "n": n_values[-1]}, n_samples, rng
+        )
+        X = np.stack([np.asarray(data, dtype=float).reshape(-1) for data in samples])
+        for n in n_values:
+            Xn = X[:, :n]
+            columns = {param: {} for param in graph_params}
+            if batch:
+                swept = batch_statistics.batched_sweep(
+                    Xn, graph_type, graph_params, batch
+                )
+                for param in graph_params:
+                    columns[param].update(swept[param])
+            if rest:
+                for param in graph_params:
+                    columns[param].update(
+                        _statistic_loop(list(Xn), graph_type, param, rest)
+                    )
+            for param in graph_params:
+                for name in metrics:
+                    frame = pd.DataFrame(
+                        {
+                            "replicate": np.arange(n_samples),
+                            "value": columns[param][name],
+                        }
+                    )
+                    frame.insert(0, "metric", name)
+                    frame.insert(0, param_name, param)
+                    frame.insert(0, "n", n)
+                    for key, value in reversed(params.items()):
+                        frame.insert(0, key, value)
+                    frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,187 @@
+"""
+Кэш результатов Монте-Карло на диске с контрольными точками.
+
+Запись кэша — каталог, имя которого — SHA-256 от параметров запуска
+(функция распределения вместе с хэшем её исходного кода, params,
+graph_type, graph_param, metric, metric_args, n, n_samples, seed,
+chunk_size). Результат хранится в result.npy и читается через
+np.load(mmap_mode='r'); пока запуск не закончен, готовые порции лежат
+в chunks/ и при повторном вызове пересчитываются только недостающие.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+_RESULT = "result.npy"
+_META = "meta.json"
+_CHUNKS = "chunks"
+
+
+def jsonable(value):
+    """Приводит параметры к виду, пригодному для канонического JSON."""
+    if isinstance(value, np.random.SeedSequence):
+        return {"entropy": value.entropy, "spawn_key": list(value.spawn_key)}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if callable(value):
+        return _function_id(value)
+    raise TypeError(f"Параметр {value!r} нельзя использовать в ключе кэша.")
+
+
+def _function_id(func) -> str:
+    """Имя функции и хэш её исходного кода (если он доступен)."""
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', func)}"
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        return name
+    return name + ":" + hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def cache_key(**fields) -> str:
+    """SHA-256 канонического JSON от параметров запуска."""
+    text = json.dumps(fields, sort_keys=True, default=jsonable)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _atomic_save(path: Path, array: np.ndarray) -> None:
+    """np.save через временный файл: прерванная запись не портит кэш."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class ResultCache:
+    """
+    Каталог кэша. max_bytes и max_age (секунды) — пределы, по которым
+    после каждой записи удаляются самые давно использованные записи
+    (см. evict).
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: int | None = None,
+        max_age: float | None = None,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key
+
+    def load(self, key: str) -> np.ndarray | None:
+        """Готовый результат (memmap только для чтения) или None."""
+        path = self._entry(key) / _RESULT
+        if not path.exists():
+            return None
+        os.utime(self._entry(key))  # время последнего использования
+        return np.load(path, mmap_mode="r")
+
+    def store(self, key: str, result: np.ndarray, meta: dict) -> np.ndarray:
+        """Сохраняет результат, удаляет контрольные точки, возвращает memmap."""
+        entry = self._entry(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        _atomic_save(entry / _RESULT, np.asarray(result))
+        meta = {**meta, "created": time.time()}
+        (entry / _META).write_text(json.dumps(meta, default=jsonable, indent=1))
+        shutil.rmtree(entry / _CHUNKS, ignore_errors=True)
+        self._evict(self.max_bytes, self.max_age, keep=key)
+        return self.load(key)
+
+    def load_chunks(self, key: str) -> dict[int, np.ndarray]:
+        """Законченные порции незавершённого запуска: {номер: массив}."""
+        chunks = self._entry(key) / _CHUNKS
+        if not chunks.is_dir():
+            return {}
+        return {int(path.stem): np.load(path) for path in chunks.glob("*.npy")}
+
+    def store_chunk(self, key: str, index: int, chunk: np.ndarray) -> None:
+        """Контрольная точка: одна законченная порция."""
+        chunks = self._entry(key) / _CHUNKS
+        chunks.mkdir(parents=True, exist_ok=True)
+        _atomic_save(chunks / f"{index:06d}.npy", chunk)
+
+    def entries(self) -> list[dict]:
+        """Записи кэша: ключ, размер, время использования, закончена ли."""
+        if not self.directory.is_dir():
+            return []
+        result = []
+        for entry in self.directory.iterdir():
+            if not entry.is_dir():
+                continue
+            result.append(
+                {
+                    "key": entry.name,
+                    "bytes": _size(entry),
+                    "used": entry.stat().st_mtime,
+                    "complete": (entry / _RESULT).exists(),
+                }
+            )
+        return sorted(result, key=lambda item: item["used"])
+
+    def evict(self, max_bytes: int | None = None, max_age: float | None = None) -> int:
+        """
+        Удаляет записи старше max_age секунд, затем самые давно
+        использованные, пока общий размер больше max_bytes. По умолчанию
+        пределы — из конструктора. Возвращает число удалённых записей.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+        return self._evict(max_bytes, max_age)
+
+    def _evict(self, max_bytes, max_age, keep: str | None = None) -> int:
+        """evict, не трогая запись keep (только что записанный результат)."""
+        if max_bytes is None and max_age is None:
+            return 0
+        entries = self.entries()
+        total = sum(item["bytes"] for item in entries)
+        now = time.time()
+        removed = 0
+        for item in entries:
+            expired = max_age is not None and now - item["used"] > max_age
+            too_big = max_bytes is not None and total > max_bytes
+            if item["key"] == keep or not (expired or too_big):
+                continue
+            shutil.rmtree(self._entry(item["key"]), ignore_errors=True)
+            total -= item["bytes"]
+            removed += 1
+        return removed
+
+    def info(self) -> dict:
+        """Сводка: каталог, число записей, незаконченные запуски, размер."""
+        entries = self.entries()
+        return {
+            "directory": str(self.directory),
+            "entries": len(entries),
+            "incomplete": sum(not item["complete"] for item in entries),
+            "bytes": sum(item["bytes"] for item in entries),
+            "oldest": entries[0]["used"] if entries else None,
+            "newest": entries[-1]["used"] if entries else None,
+        }
+
+    def clear(self) -> None:
+        """Удаляет весь каталог кэша."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def cache_info(cache: str | os.PathLike | ResultCache) -> dict:
+    """Сводка по каталогу кэша (см. ResultCache.info)."""
+    if not isinstance(cache, ResultCache):
+        cache = ResultCache(cache)
+    return cache.info()
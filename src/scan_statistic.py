@@ -0,0 +1,249 @@
+"""
+Приближённое распределение clique_number дистанционного графа без симуляции.
+
+Для одномерного дистанционного графа clique_number(d) — скан-статистика
+S: наибольшее число точек выборки в окне ширины d. Окно [y - d, y]
+скользит вправо; S >= k, когда правый край впервые забирает точку при
+k - 1 точках внутри. Интенсивность таких событий при плотности f и
+вероятности окна p(y) = F(y) - F(y - d):
+
+    n f(y) [b(k - 1) - b(k)]_+ ,   b(j) = Binom(j; n - 1, p(y)),
+
+— биномиальный аналог приближения Альма (Alm, 1983) для скан-статистики
+пуассоновского процесса: множитель 1 - b(k)/b(k - 1) убирает «сгустки»
+повторных пересечений уровня k. Отсюда
+
+    P(S <= k - 1) ~ P(Bin(n, p_max) <= k - 1) * exp(-H_k),
+    H_k = ∫ n [b(k - 1) - b(k)]_+ dF(y),
+
+где первый множитель — вероятность для самого тяжёлого окна (как
+множитель F_p(k - 1; ψ) у Альма). Интеграл берётся как сумма Стилтьеса
+по приращениям F на сетке y = медиана + масштаб · tan(t), поэтому нужна
+только функция распределения H0 (годится и для тяжёлых хвостов Stable,
+и для особенности плотности χ² в нуле).
+
+Точность (сравнение с monte_carlo_simulation по 20000 повторениям,
+χ², χ, нормальное, Коши, Stable(1.5); n = 50..1000, d = 0.01..1):
+
+    верхний хвост (P(S <= s) >= 0.8) — ошибка функции распределения не
+        больше 0.005, критические значения совпадают с эмпирическими в
+        пределах ±1; фактический уровень критерия — alpha с точностью до
+        этой ошибки и дискретности S (встречалось 0.102 при alpha = 0.1),
+        а не гарантированно не выше alpha;
+    всё распределение (KS) — 0.02..0.07 при вероятности самого тяжёлого
+        окна p_max <= 0.03 (ожидаемое число точек в окне n·p_max до ~8),
+        но до 0.25 при p_max ~ 0.2..0.4: середина распределения смещена,
+        поэтому мощность, у которой критическое значение попадает в
+        середину распределения H1, при больших p_max лучше проверять
+        симуляцией.
+
+validate_clique_number возвращает обе ошибки для конкретных параметров.
+"""
+
+import numpy as np
+from scipy import special, stats
+
+from .distribution_generators import (
+    generate_chi,
+    generate_chi2,
+    sample_normal,
+    sample_stable,
+)
+from .monte_carlo import monte_carlo_simulation
+
+# точек сетки по y и порог, ниже которого вероятности считаются нулём
+_GRID_SIZE = 2000
+_TINY = 1e-15
+
+
+def _stable(alpha: float):
+    """Симметричное Stable(alpha) в параметризации draw_stable."""
+    if alpha == 1.0:
+        return stats.cauchy()
+    if alpha == 2.0:
+        return stats.norm(scale=np.sqrt(2))
+    return stats.levy_stable(alpha, 0.0)
+
+
+# Генераторы distribution_generators и их распределения в scipy.stats
+SCIPY_DISTRIBUTIONS = {
+    generate_chi2: lambda nu: stats.chi2(nu),
+    generate_chi: lambda nu: stats.chi(nu),
+    sample_normal: lambda sigma: stats.norm(scale=sigma),
+    sample_stable: _stable,
+}
+
+
+def frozen_distribution(distribution, params: dict = None):
+    """
+    Распределение scipy.stats для генератора с параметрами params (без n)
+    или само distribution, если это уже распределение scipy.
+    """
+    if hasattr(distribution, "cdf"):
+        return distribution
+    if distribution not in SCIPY_DISTRIBUTIONS:
+        raise ValueError(
+            f"Для {getattr(distribution, '__name__', distribution)} нет "
+            f"распределения scipy; передайте его явно."
+        )
+    params = {key: value for key, value in (params or {}).items() if key != "n"}
+    return SCIPY_DISTRIBUTIONS[distribution](**params)
+
+
+def _window_probabilities(dist, d: float, grid_size: int):
+    """Сетка y, F(y) и p(y) = F(y) - F(y - d) (хвост справа — через sf)."""
+    median = float(dist.median())
+    q1, q3 = dist.ppf([0.25, 0.75])
+    scale = max(float(q3 - q1) / 2, d)
+    t = (np.arange(grid_size) + 0.5) / grid_size * np.pi - np.pi / 2
+    y = median + scale * np.tan(t)
+    cdf = dist.cdf(y)
+    upper = y - d > median
+    p = np.where(upper, dist.sf(y - d) - dist.sf(y), cdf - dist.cdf(y - d))
+    return cdf, np.clip(p, 0.0, 1.0)
+
+
+def _binom_pmf(j: np.ndarray, m: int, p: np.ndarray) -> np.ndarray:
+    """Binom(j; m, p) через логарифмы (быстрее stats.binom.pmf на матрицах)."""
+    log_pmf = (
+        special.gammaln(m + 1)
+        - special.gammaln(j + 1)
+        - special.gammaln(m - j + 1)
+        + special.xlogy(j, p)
+        + special.xlog1py(m - j, -p)
+    )
+    return np.exp(log_pmf)
+
+
+def clique_number_cdf(
+    distribution,
+    params: dict = None,
+    n: int = 100,
+    d: float = 1.0,
+    grid_size: int = _GRID_SIZE,
+) -> np.ndarray:
+    """
+    Приближённая функция распределения clique_number дистанционного графа
+    на n точках из distribution(**params) с порогом d: массив длины n + 1,
+    элемент s — P(clique_number <= s).
+
+    distribution — генератор из distribution_generators (см.
+    SCIPY_DISTRIBUTIONS) или распределение scipy.stats.
+    """
+    dist = frozen_distribution(distribution, params)
+    F, p = _window_probabilities(dist, d, grid_size)
+    p_max = float(p.max())
+    result = np.zeros(n + 1)
+    # вне [lo, hi] функция распределения меньше _TINY или больше 1 - _TINY
+    lo = max(int(stats.binom.ppf(_TINY, n, p_max)) - 1, 1)
+    # stats.binom.isf теряет точность на таких уровнях: ищем по pmf справа
+    # от моды, где она убывает быстрее геометрической прогрессии
+    mode = int(n * p_max)
+    tail = n * _binom_pmf(np.arange(mode, n), n - 1, p_max) < _TINY
+    hi = min(mode + int(np.argmax(tail)) + 2, n) if tail.any() else n
+    result[hi:] = 1.0
+    if lo >= hi:
+        return result
+
+    s = np.arange(lo, hi)[:, None]  # P(S <= s) = P(S < k), k = s + 1
+    pmf = _binom_pmf(np.arange(lo, hi + 1)[:, None], n - 1, p)
+    rate = n * np.clip(pmf[:-1] - pmf[1:], 0.0, None)
+    # интеграл Стилтьеса по dF(y): трапеции по приращениям F
+    H = np.sum((rate[:, 1:] + rate[:, :-1]) / 2 * np.diff(F), axis=1)
+    window = stats.binom.cdf(s[:, 0], n, p_max)
+    result[lo:hi] = window * np.exp(-H)
+    return np.maximum.accumulate(result)
+
+
+def clique_number_critical_value(
+    distribution,
+    params: dict = None,
+    n: int = 100,
+    d: float = 1.0,
+    alpha: float = 0.05,
+    grid_size: int = _GRID_SIZE,
+):
+    """
+    Критическое значение c критерия clique_number > c уровня alpha:
+    наименьшее целое c с P(clique_number <= c) >= 1 - alpha. alpha может
+    быть массивом.
+    """
+    cdf = clique_number_cdf(distribution, params, n, d, grid_size)
+    levels = 1 - np.asarray(alpha, dtype=float)
+    return np.searchsorted(cdf, levels - 1e-12, side="left")
+
+
+def clique_number_power(
+    h0_distribution,
+    h0_params: dict,
+    h1_distribution,
+    h1_params: dict,
+    n: int,
+    d: float,
+    alpha: float = 0.05,
+    grid_size: int = _GRID_SIZE,
+):
+    """
+    Критическое значение по H0 и мощность P_H1(clique_number > c).
+    Возвращает (critical, power); alpha может быть массивом.
+    """
+    critical = clique_number_critical_value(
+        h0_distribution, h0_params, n, d, alpha, grid_size
+    )
+    h1_cdf = clique_number_cdf(h1_distribution, h1_params, n, d, grid_size)
+    return critical, 1 - h1_cdf[critical]
+
+
+def validate_clique_number(
+    distribution,
+    params: dict,
+    n: int,
+    d: float,
+    alphas=(0.1, 0.05, 0.01),
+    n_samples: int = 2000,
+    seed=None,
+    grid_size: int = _GRID_SIZE,
+    **mc_kwargs,
+) -> dict:
+    """
+    Сравнение приближения с monte_carlo_simulation (distribution —
+    генератор, mc_kwargs передаются в monte_carlo_simulation).
+
+    Возвращает словарь: cdf и empirical_cdf (массивы длины n + 1),
+    ks — наибольшее расхождение функций распределения, tail_error — оно
+    же начиная с наименьшего критического значения (от него зависит
+    фактический уровень), critical и
+    empirical_critical (по alphas; эмпирическое — как
+    calculate_critical_region), size — доля повторений выше
+    приближённого критического значения (фактический уровень).
+    """
+    sample = monte_carlo_simulation(
+        distribution,
+        {**params, "n": n},
+        n_samples=n_samples,
+        graph_type="distance",
+        graph_param=d,
+        metric="clique_number",
+        seed=seed,
+        **mc_kwargs,
+    )
+    sample = np.asarray(sample)
+    cdf = clique_number_cdf(distribution, params, n, d, grid_size)
+    counts = np.bincount(sample.astype(np.int64), minlength=n + 1)
+    empirical = np.cumsum(counts) / sample.shape[0]
+    alphas = np.asarray(alphas, dtype=float)
+    critical = clique_number_critical_value(
+        distribution, params, n, d, alphas, grid_size
+    )
+    error = np.abs(cdf - empirical)
+    tail = error[np.arange(n + 1) >= critical.min()]
+    return {
+        "cdf": cdf,
+        "empirical_cdf": empirical,
+        "ks": float(error.max()),
+        "tail_error": float(tail.max()),
+        "alphas": alphas,
+        "critical": critical,
+        "empirical_critical": np.quantile(sample, 1 - alphas),
+        "size": 1 - empirical[critical],
+    }
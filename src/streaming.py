@@ -0,0 +1,279 @@
+"""
+Потоковые накопители распределения статистики с ограниченной памятью.
+
+Повторения Монте-Карло поступают порциями (update) и не хранятся:
+целочисленные статистики графа (степени, клики, число компонент)
+копятся в точной гистограмме, непрерывные — в скетче KLL. Накопители
+из разных процессов объединяются merge(); по итогу доступны квантили
+сразу для многих уровней и вероятности превышения порога — из них
+hypothesis_testing строит критические значения, кривые мощности и ROC.
+"""
+
+import numpy as np
+
+# наибольший размах значений, который ещё хранится точной гистограммой
+_MAX_BINS = 2**20
+
+
+def _linear_quantile(q, total, value_at_rank):
+    """
+    Квантиль с линейной интерполяцией между порядковыми статистиками
+    (как np.quantile по умолчанию); value_at_rank(r) — r-я по величине.
+    """
+    q = np.asarray(q, dtype=float)
+    pos = q * (total - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, total - 1)
+    v_lo, v_hi = value_at_rank(lo), value_at_rank(hi)
+    return v_lo + (pos - lo) * (v_hi - v_lo)
+
+
+class IntegerHistogram:
+    """Точная гистограмма целых значений: counts[i] — число значений offset + i."""
+
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def _extend(self, low: int, high: int) -> None:
+        """Расширяет диапазон до [low, high]."""
+        if self.counts.shape[0] == 0:
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        old_high = self.offset + self.counts.shape[0] - 1
+        low, high = min(low, self.offset), max(high, old_high)
+        counts = np.zeros(high - low + 1, dtype=np.int64)
+        start = self.offset - low
+        stop = start + self.counts.shape[0]
+        counts[start:stop] = self.counts
+        self.offset, self.counts = low, counts
+
+    def add_counts(self, values: np.ndarray, counts: np.ndarray) -> None:
+        """Добавляет значения values с кратностями counts."""
+        if values.shape[0] == 0:
+            return
+        self._extend(int(values.min()), int(values.max()))
+        np.add.at(self.counts, values - self.offset, counts)
+
+    def update(self, values) -> "IntegerHistogram":
+        values = np.asarray(values).astype(np.int64).ravel()
+        if values.shape[0]:
+            low = int(values.min())
+            self._extend(low, int(values.max()))
+            shifted = values - self.offset
+            self.counts += np.bincount(shifted, minlength=self.counts.shape[0])
+        return self
+
+    def merge(self, other: "IntegerHistogram") -> "IntegerHistogram":
+        support = np.nonzero(other.counts)[0]
+        self.add_counts(support + other.offset, other.counts[support])
+        return self
+
+    def support(self) -> tuple[np.ndarray, np.ndarray]:
+        """Встречающиеся значения и их частоты."""
+        idx = np.nonzero(self.counts)[0]
+        return idx + self.offset, self.counts[idx]
+
+    def quantile(self, q):
+        values, counts = self.support()
+        cum = np.cumsum(counts)
+
+        def value_at_rank(rank):
+            return values[np.searchsorted(cum, rank, side="right")].astype(float)
+
+        return _linear_quantile(q, int(cum[-1]), value_at_rank)
+
+    def exceedance(self, threshold):
+        """Доля значений строго больше threshold (для массива порогов тоже)."""
+        values, counts = self.support()
+        tail = np.concatenate([np.cumsum(counts[::-1])[::-1], [0]])
+        idx = np.searchsorted(values, threshold, side="right")
+        return tail[idx] / tail[0]
+
+
+class KLLSketch:
+    """
+    Скетч KLL для квантилей: уровень h хранит элементы веса 2**h, при
+    переполнении уровень сортируется и каждый второй элемент (со
+    случайным сдвигом) переходит на уровень выше. Память O(k log(N/k)),
+    ошибка ранга порядка 1/k; скетчи объединяются конкатенацией уровней.
+    """
+
+    def __init__(self, k: int = 200, seed=None):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.levels = [np.zeros(0)]
+
+    @property
+    def count(self) -> int:
+        return int(sum(level.shape[0] << h for h, level in enumerate(self.levels)))
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.shape[0] <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+            level = np.sort(level)
+            even = level.shape[0] - level.shape[0] % 2
+            keep, pairs = level[even:], level[:even]
+            first = self.rng.integers(2)
+            promoted = pairs[first::2]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            # новый уровень уменьшает ёмкость нижних — проверяем заново
+            h = 0
+
+    def add_weighted(self, values: np.ndarray, counts: np.ndarray) -> None:
+        """Значения с кратностями: кратность раскладывается по битам на уровни."""
+        counts = np.asarray(counts, dtype=np.int64)
+        h = 0
+        while np.any(counts):
+            if h == len(self.levels):
+                self.levels.append(np.zeros(0))
+            chosen = values[(counts & 1) == 1]
+            self.levels[h] = np.concatenate([self.levels[h], chosen.astype(float)])
+            counts = counts >> 1
+            h += 1
+        self._compress()
+
+    def update(self, values) -> "KLLSketch":
+        values = np.asarray(values, dtype=float).ravel()
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compress()
+        return self
+
+    def _weighted(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(level.shape[0], 1 << h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        items, weights = self._weighted()
+        cum = np.cumsum(weights)
+
+        def value_at_rank(rank):
+            return items[np.searchsorted(cum, rank, side="right")]
+
+        return _linear_quantile(q, int(cum[-1]), value_at_rank)
+
+    def exceedance(self, threshold):
+        items, weights = self._weighted()
+        tail = np.concatenate([np.cumsum(weights[::-1])[::-1], [0]])
+        idx = np.searchsorted(items, threshold, side="right")
+        return tail[idx] / tail[0]
+
+    def support(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._weighted()
+
+
+class StreamingQuantiles:
+    """
+    Накопитель статистики: точная гистограмма, пока значения целые и их
+    размах не больше _MAX_BINS, затем — скетч KLL (гистограмма переносится
+    в него без потерь веса). Интерфейс: update, merge, count, quantile,
+    exceedance, critical_values, support.
+    """
+
+    def __init__(self, k: int = 200, seed=None):
+        self.k = k
+        self.seed = seed
+        self.histogram = IntegerHistogram()
+        self.sketch = None
+
+    @property
+    def exact(self) -> bool:
+        return self.sketch is None
+
+    @property
+    def _store(self):
+        return self.histogram if self.sketch is None else self.sketch
+
+    @property
+    def count(self) -> int:
+        return self._store.count
+
+    def _to_sketch(self) -> None:
+        self.sketch = KLLSketch(self.k, self.seed)
+        values, counts = self.histogram.support()
+        self.sketch.add_weighted(values, counts)
+        self.histogram = None
+
+    def _fits(self, low: float, high: float) -> bool:
+        h = self.histogram
+        if h.counts.shape[0]:
+            low = min(low, h.offset)
+            high = max(high, h.offset + h.counts.shape[0] - 1)
+        return high - low < _MAX_BINS
+
+    def update(self, values) -> "StreamingQuantiles":
+        values = np.asarray(values, dtype=float).ravel()
+        if values.shape[0] == 0:
+            return self
+        if self.sketch is None:
+            integral = np.all(values == np.round(values))
+            if integral and self._fits(values.min(), values.max()):
+                self.histogram.update(values)
+                return self
+            self._to_sketch()
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other: "StreamingQuantiles") -> "StreamingQuantiles":
+        if other.sketch is None and self.sketch is None:
+            values, _ = other.histogram.support()
+            if values.shape[0] == 0 or self._fits(values.min(), values.max()):
+                self.histogram.merge(other.histogram)
+                return self
+        if self.sketch is None:
+            self._to_sketch()
+        if other.sketch is None:
+            self.sketch.add_weighted(*other.histogram.support())
+        else:
+            self.sketch.merge(other.sketch)
+        return self
+
+    def quantile(self, q):
+        return self._store.quantile(q)
+
+    def exceedance(self, threshold):
+        return self._store.exceedance(threshold)
+
+    def support(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._store.support()
+
+    def critical_values(self, alphas):
+        """Критические значения (квантили 1 - alpha) сразу для многих alpha."""
+        return self.quantile(1 - np.asarray(alphas, dtype=float))
+
+    def __repr__(self) -> str:
+        kind = "exact" if self.exact else f"KLL(k={self.k})"
+        return f"StreamingQuantiles(count={self.count}, {kind})"
+
+
+def accumulate(values, k: int = 200) -> StreamingQuantiles:
+    """Накопитель по готовому массиву значений."""
+    return StreamingQuantiles(k).update(values)
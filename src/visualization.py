@@ -1,8 +1,110 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+"""
+Графики экспериментов.
+
+matplotlib импортируется только при первом построении графика. Плотности
+H0/H1 считаются без seaborn: значения (или готовая гистограмма, или
+потоковый накопитель streaming.StreamingQuantiles) линейно раскладываются
+на сетку из grid_size точек и сглаживаются гауссовым ядром через FFT,
+так что стоимость не зависит от числа повторений. render_figures строит
+список графиков в файлы в процессах пула с бэкендом Agg (без дисплея).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Union
+
 import numpy as np
 
+_HEADLESS = False
+# размер сетки плотности и отступ от крайних значений в ширинах ядра
+_GRID_SIZE = 512
+_CUT = 3
+
+
+def use_headless(headless: bool = True) -> None:
+    """Строить графики бэкендом Agg (только в файлы, дисплей не нужен)."""
+    global _HEADLESS
+    _HEADLESS = headless
+    if headless:
+        import matplotlib
+
+        matplotlib.use("Agg", force=True)
+
+
+def _pyplot():
+    """matplotlib.pyplot, импортируемый при первом обращении."""
+    import matplotlib
+
+    if _HEADLESS:
+        matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _weighted_values(stats) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (значения, веса) из массива, пары (значения, частоты) или накопителя
+    с методом support() (streaming.StreamingQuantiles).
+    """
+    if hasattr(stats, "support"):
+        values, counts = stats.support()
+    elif isinstance(stats, tuple):
+        values, counts = stats
+    else:
+        values = np.asarray(stats, dtype=float).ravel()
+        counts = np.ones(values.shape[0])
+    return np.asarray(values, dtype=float), np.asarray(counts, dtype=float)
+
+
+def density(
+    stats, grid_size: int = _GRID_SIZE, bandwidth: float = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ядерная оценка плотности на равномерной сетке: (x, плотность).
+
+    stats — массив значений, пара (значения, частоты) (предварительно
+    посчитанная гистограмма) или накопитель StreamingQuantiles. Ширина
+    ядра по умолчанию — правило Скотта (частоты — число повторений), как
+    в sns.kdeplot; сетка выходит за крайние значения на 3 ширины ядра.
+    """
+    values, weights = _weighted_values(stats)
+    total = weights.sum()
+    mean = np.average(values, weights=weights)
+    std = np.sqrt(np.average((values - mean) ** 2, weights=weights))
+    if bandwidth is None:
+        # веса — частоты повторений, объём выборки равен их сумме;
+        # при нулевом разбросе — половина шага целочисленной статистики
+        bandwidth = std * total ** (-1 / 5) if std > 0 else 0.5
+    lo = values.min() - _CUT * bandwidth
+    hi = values.max() + _CUT * bandwidth
+    x = np.linspace(lo, hi, grid_size)
+    dx = x[1] - x[0]
+
+    # линейное разнесение веса по двум соседним узлам сетки
+    pos = (values - lo) / dx
+    left = np.minimum(np.floor(pos).astype(np.int64), grid_size - 2)
+    frac = pos - left
+    binned = np.bincount(left, weights * (1 - frac), minlength=grid_size)
+    binned += np.bincount(left + 1, weights * frac, minlength=grid_size)
+
+    # свёртка с ядром через FFT с дополнением нулями (без заворота)
+    offsets = np.arange(-(grid_size - 1), grid_size) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    kernel /= np.sqrt(2 * np.pi) * bandwidth
+    size = 2 * grid_size - 1 + grid_size - 1
+    smoothed = np.fft.irfft(np.fft.rfft(binned, size) * np.fft.rfft(kernel, size), size)
+    start = grid_size - 1
+    stop = start + grid_size
+    return x, np.maximum(smoothed[start:stop], 0) / total
+
+
+def _plot_density(ax, stats, label, color, alpha=0.25) -> None:
+    """Заполненная кривая плотности (аналог sns.kdeplot(fill=True))."""
+    x, y = density(stats)
+    ax.fill_between(x, y, color=color, alpha=alpha, linewidth=0)
+    ax.plot(x, y, color=color, label=label)
+
 
 def plot_distributions(
     h0_stats: np.ndarray,
@@ -14,15 +116,17 @@ def plot_distributions(
     Визуализирует распределения характеристик для H0 и H1.
 
     Параметры:
-        h0_stats (np.ndarray): Статистика для гипотезы H0.
+        h0_stats (np.ndarray): Статистика для гипотезы H0 (массив,
+        пара (значения, частоты) или StreamingQuantiles, см. density).
         h1_stats (np.ndarray): Статистика для гипотезы H1.
         metric_name (str): Название метрики для подписей.
         save_path (str): Путь для сохранения графика,
         если None, график отображается.
     """
+    plt = _pyplot()
     plt.figure(figsize=(10, 6))
-    sns.kdeplot(h0_stats, label="H0", fill=True, alpha=0.5, color="blue")
-    sns.kdeplot(h1_stats, label="H1", fill=True, alpha=0.5, color="red")
+    _plot_density(plt.gca(), h0_stats, "H0", "blue", alpha=0.5)
+    _plot_density(plt.gca(), h1_stats, "H1", "red", alpha=0.5)
     plt.xlabel(metric_name, fontsize=12)
     plt.ylabel("Плотность", fontsize=12)
     plt.legend()
@@ -53,6 +157,7 @@ def plot_line(
         save_path (str, optional): Путь для сохранения изображения,
         если None, покажет график.
     """
+    plt = _pyplot()
     plt.figure(figsize=(10, 5))
     plt.plot(
         x_values,
@@ -66,15 +171,12 @@ def plot_line(
     plt.ylabel(y_label, fontsize=12)
     plt.title(title, fontsize=14)
     plt.grid(True)
-    if save_path:
-        plt.savefig(save_path, bbox_inches="tight")
-        plt.close()
-    else:
-        plt.show()
+    _save_or_show(save_path)
 
 
 def _save_or_show(save_path: str) -> None:
     """Вспомогательная функция для сохранения/отображения графика."""
+    plt = _pyplot()
     if save_path:
         plt.savefig(save_path, bbox_inches="tight")
         plt.close()
@@ -89,11 +191,16 @@ def plot_critical_region(
     title: str,
     xlabel: str,
     alpha: float = 0.05,
+    save_path: str = None,
 ) -> None:
-    """Визуализирует распределения H0/H1 и критическую область."""
+    """
+    Визуализирует распределения H0/H1 и критическую область.
+    save_path — путь для сохранения, если None, график отображается.
+    """
+    plt = _pyplot()
     plt.figure(figsize=(10, 6))
-    sns.kdeplot(h0_stats, label="H0", fill=True, color="blue")
-    sns.kdeplot(h1_stats, label="H1", fill=True, color="orange")
+    _plot_density(plt.gca(), h0_stats, "H0", "blue")
+    _plot_density(plt.gca(), h1_stats, "H1", "orange")
     plt.axvline(
         critical_value,
         color="red",
@@ -104,11 +211,16 @@ def plot_critical_region(
     plt.ylabel("Плотность")
     plt.title(title)
     plt.legend()
-    plt.show()
+    _save_or_show(save_path)
 
 
 def visualize_metrics(
-    df, metrics=None, size_col="n", algo_col="Algorithm", figsize=(10, 6)
+    df,
+    metrics=None,
+    size_col="n",
+    algo_col="Algorithm",
+    figsize=(10, 6),
+    save_path=None,
 ):
     """
     Строит компактный «сеточный» график ключевых метрик
@@ -127,6 +239,8 @@ def visualize_metrics(
         Имя столбца с названием алгоритма (для легенды).
     figsize : tuple
         Размер фигуры (ширина, высота).
+    save_path : str или None
+        Путь для сохранения, если None, график отображается.
     """
     if metrics is None:
         metrics = [
@@ -141,6 +255,7 @@ def visualize_metrics(
     n_metrics = len(metrics)
     ncols = 2
     nrows = (n_metrics + 1) // ncols
+    plt = _pyplot()
     fig, axes = plt.subplots(nrows=nrows, ncols=ncols, figsize=figsize, sharex=True)
     axes = axes.flatten()
 
@@ -158,10 +273,10 @@ def visualize_metrics(
         fig.delaxes(ax)
 
     plt.tight_layout()
-    plt.show()
+    _save_or_show(save_path)
 
 
-def visualize_feature_importances(df_imp, size_col="n"):
+def visualize_feature_importances(df_imp, size_col="n", save_path=None):
     """
     Строит график изменения важности признаков
      из RandomForest в зависимости от размера выборки.
@@ -173,7 +288,10 @@ def visualize_feature_importances(df_imp, size_col="n"):
         а столбцы — названия признаков, содержащие их относительную важность.
     size_col : str
         Название индекса в df_imp, используемое по оси X (по умолчанию 'n').
+    save_path : str или None
+        Путь для сохранения, если None, график отображается.
     """
+    plt = _pyplot()
     plt.figure()
     for feat in df_imp.columns:
         plt.plot(df_imp.index, df_imp[feat], marker="o", label=feat)
@@ -182,4 +300,53 @@ def visualize_feature_importances(df_imp, size_col="n"):
     plt.ylabel("Importance (normalized)")
     plt.legend()
     plt.grid(True)
-    plt.show()
+    _save_or_show(save_path)
+
+
+_PLOTS = {
+    "distributions": plot_distributions,
+    "line": plot_line,
+    "critical_region": plot_critical_region,
+    "metrics": visualize_metrics,
+    "feature_importances": visualize_feature_importances,
+}
+
+
+def _render(spec: dict) -> str:
+    """Строит один график по описанию spec в файл (в процессе пула)."""
+    use_headless()
+    spec = dict(spec)
+    kind = spec.pop("kind")
+    if not spec.get("save_path"):
+        raise ValueError("В описании графика нужен save_path.")
+    _PLOTS[kind](**spec)
+    return spec["save_path"]
+
+
+def render_figures(specs: List[dict], n_jobs: int = -1) -> List[str]:
+    """
+    Строит графики в файлы параллельно, бэкенд Agg.
+
+    specs — список словарей: "kind" (distributions, line, critical_region,
+    metrics, feature_importances), "save_path" и остальные аргументы
+    соответствующей функции. Большие выборки лучше передавать
+    гистограммой или StreamingQuantiles — в процесс уходит меньше данных.
+    n_jobs — число процессов (-1 — все ядра, 1 — в текущем процессе).
+    Возвращает пути в порядке specs.
+    """
+    for spec in specs:
+        if spec.get("kind") not in _PLOTS:
+            raise ValueError(f"Неизвестный вид графика: {spec.get('kind')!r}")
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(specs))
+    if n_jobs <= 1:
+        # в текущем процессе: после построения возвращаем прежний бэкенд
+        headless, backend = _HEADLESS, _pyplot().get_backend()
+        try:
+            return [_render(spec) for spec in specs]
+        finally:
+            use_headless(headless)
+            _pyplot().switch_backend(backend)
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(_render, specs))
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from src import benchmark
+
+
+def test_scaling_exponent_and_compare():
+    records = [
+        {"name": "f", "params": {"k": 3}, "n": n, "seconds": 1e-6 * n**2}
+        for n in (100, 1000, 10000)
+    ]
+    assert benchmark.scaling_exponents(records)["f[k=3]"] == pytest.approx(2.0)
+
+    baseline = {"results": records}
+    slower = {"results": [{**r, "seconds": r["seconds"] * 1.5} for r in records]}
+    assert benchmark.compare(slower, baseline, tolerance=0.6) == []
+    regressions = benchmark.compare(slower, baseline, tolerance=0.25)
+    # n=100 (1e-2 с) выше порога шума, все три случая медленнее
+    assert [item["case"] for item in regressions] == [
+        "f[k=3] n=100",
+        "f[k=3] n=1000",
+        "f[k=3] n=10000",
+    ]
+
+
+def test_cli_writes_baseline_and_compares(tmp_path):
+    out = tmp_path / "baseline.json"
+    argv = ["--sizes", "50", "200", "--filter", "build_knn_graph[k=3]"]
+    assert benchmark.main(argv + ["--out", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert [record["n"] for record in report["results"]] == [50, 200]
+    assert all(record["peak_bytes"] > 0 for record in report["results"])
+    assert "build_knn_graph[k=3]" in report["scaling"]
+
+    # базовый отчёт в 100 раз быстрее — режим сравнения должен упасть
+    for record in report["results"]:
+        record["seconds"] /= 100
+    out.write_text(json.dumps(report))
+    assert benchmark.main(argv + ["--compare", str(out), "--min-seconds", "0"]) == 1
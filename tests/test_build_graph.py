@@ -1,4 +1,5 @@
 import numpy as np
+import networkx as nx
 from src.build_graph import build_knn_graph, build_distance_graph
 
 
@@ -19,3 +20,118 @@ def test_build_distance_graph_threshold():
     # Узел 0 и 1 соединены, 2 изолирован
     assert G.has_edge(0, 1)
     assert not G.has_edge(0, 2) and not G.has_edge(1, 2)
+
+
+def _reference_distance_graph(data, d):
+    G = nx.Graph()
+    for i, coord in enumerate(data):
+        G.add_node(i, x=float(coord))
+    for i in range(len(data)):
+        for j in range(i + 1, len(data)):
+            if abs(data[i] - data[j]) <= d:
+                G.add_edge(i, j)
+    return G
+
+
+def test_build_distance_graph_matches_pairwise():
+    rng = np.random.default_rng(0)
+    # округление даёт совпадающие координаты и рёбра ровно на границе d
+    data = np.round(rng.normal(size=300), 1)
+    for d in [0.1, 0.3, 1.0]:
+        G = build_distance_graph(data, d=d)
+        ref = _reference_distance_graph(data, d)
+        assert list(G.nodes(data=True)) == list(ref.nodes(data=True))
+        assert list(G.edges()) == list(ref.edges())
+
+
+def test_build_distance_graph_outputs():
+    data = np.array([0.0, 0.5, 2.0, 2.4])
+    rows, cols = build_distance_graph(data, d=1.0, output="edges")
+    assert rows.tolist() == [0, 2] and cols.tolist() == [1, 3]
+    A = build_distance_graph(data, d=1.0, output="csr")
+    assert A.shape == (4, 4)
+    assert (A != A.T).nnz == 0 and A.nnz == 4
+
+
+def test_build_distance_graph_isolated_warning(capsys):
+    build_distance_graph(np.array([0.0, 5.0]), d=1.0)
+    assert "[WARNING]" in capsys.readouterr().out
+
+
+def test_build_knn_graph_matches_sklearn():
+    from sklearn.neighbors import NearestNeighbors
+
+    rng = np.random.default_rng(1)
+    data = rng.chisquare(5, size=200)
+    k = 7
+    _, indices = (
+        NearestNeighbors(n_neighbors=k + 1).fit(data[:, None]).kneighbors(data[:, None])
+    )
+    ref = {
+        (min(i, j), max(i, j))
+        for i, neighs in enumerate(indices)
+        for j in neighs
+        if i != j
+    }
+    G = build_knn_graph(data.reshape(-1, 1), k=k)
+    assert {tuple(sorted(e)) for e in G.edges()} == ref
+    assert all(G.nodes[i]["x"] == data[i] for i in G.nodes)
+
+
+def test_knn_neighbors_batch_and_duplicates():
+    from src.build_graph import knn_neighbors
+
+    rng = np.random.default_rng(2)
+    X = np.round(rng.normal(size=(4, 50)), 1)
+    nbrs = knn_neighbors(X, 3)
+    assert nbrs.shape == (4, 50, 3)
+    for s in range(4):
+        for i in range(50):
+            dist = np.abs(X[s] - X[s, i])
+            dist[i] = np.inf
+            expected = np.lexsort((np.arange(50), dist))[:3]
+            assert sorted(nbrs[s, i]) == sorted(expected)
+
+
+def test_knn_neighbors_ties_go_to_smaller_index():
+    from src.build_graph import knn_neighbors
+
+    assert knn_neighbors(np.array([1.0, 1.0, 1.0]), 1).tolist() == [[1], [0], [0]]
+    # равные расстояния слева и справа
+    assert knn_neighbors(np.array([0.0, 1.0, 2.0]), 1).tolist() == [[1], [0], [1]]
+    assert knn_neighbors(np.array([2.0, 1.0, 0.0, 1.0]), 2).tolist() == [
+        [1, 3],
+        [3, 0],
+        [1, 3],
+        [1, 0],
+    ]
+
+
+def test_multidimensional_graphs_match_pairwise():
+    from scipy.spatial.distance import cdist
+
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(200, 3))
+    for metric in ("euclidean", "chebyshev"):
+        D = cdist(X, X, metric)
+        rows, cols = build_distance_graph(X, d=0.7, output="edges", metric=metric)
+        iu = np.triu_indices(200, 1)
+        mask = D[iu] <= 0.7
+        assert rows.tolist() == iu[0][mask].tolist()
+        assert cols.tolist() == iu[1][mask].tolist()
+
+        np.fill_diagonal(D, np.inf)
+        expected = {
+            (min(i, j), max(i, j)) for i in range(200) for j in np.argsort(D[i])[:4]
+        }
+        rows, cols = build_knn_graph(X, 4, output="edges", metric=metric, workers=2)
+        assert set(zip(rows.tolist(), cols.tolist())) == expected
+
+    G = build_knn_graph(X, 4)
+    assert G.nodes[0]["x"] == tuple(X[0])
+    # одномерные данные: та же ветка, что и раньше, для любой метрики
+    x = X[:, 0]
+    for build, param in ((build_knn_graph, 3), (build_distance_graph, 0.1)):
+        reference = build(x, param, output="edges")
+        columns = build(x[:, None], param, output="edges", metric="chebyshev")
+        assert all(np.array_equal(a, b) for a, b in zip(reference, columns))
@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+from scipy import stats
 from src.distribution_generators import sample_stable, sample_normal
 
 
@@ -22,4 +23,46 @@ def test_sample_stable_shape():
     assert isinstance(data, np.ndarray)
     assert data.shape == (n,)
     # Проверяем, что значения не нулевые
-    assert np.any(data != 0)
\ No newline at end of file
+    assert np.any(data != 0)
+
+
+@pytest.mark.parametrize(
+    "draw, param, reference",
+    [
+        ("draw_chi2", 5, lambda: stats.chi2(5)),
+        ("draw_chi", 5, lambda: stats.chi(5)),
+        ("draw_normal", 2.0, lambda: stats.norm(scale=2.0)),
+        ("draw_stable", 1.0, lambda: stats.cauchy()),
+        ("draw_stable", 2.0, lambda: stats.norm(scale=np.sqrt(2.0))),
+    ],
+)
+def test_generator_samplers_match_distributions(draw, param, reference):
+    import src.distribution_generators as dg
+
+    rng = np.random.default_rng(0)
+    data = getattr(dg, draw)(rng, param, size=(4, 1000))
+    assert data.shape == (4, 1000)
+    assert stats.kstest(data.ravel(), reference().cdf).pvalue > 0.001
+
+
+def test_draw_stable_matches_levy_stable_and_reuses_buffer():
+    from src.distribution_generators import draw_stable
+
+    rng = np.random.default_rng(1)
+    out = np.empty(3000)
+    data = draw_stable(rng, 1.5, out=out)
+    assert data is out
+    reference = stats.levy_stable.rvs(1.5, 0.0, size=3000, random_state=2)
+    assert stats.ks_2samp(data, reference).pvalue > 0.001
+
+
+@pytest.mark.parametrize(
+    "draw, param",
+    [("draw_chi2", 5), ("draw_chi", 5), ("draw_normal", 2.0), ("draw_stable", 1.5)],
+)
+def test_generator_samplers_default_size_is_scalar(draw, param):
+    import src.distribution_generators as dg
+
+    value = getattr(dg, draw)(np.random.default_rng(0), param)
+    assert value.shape == ()
+    assert np.isfinite(float(value))
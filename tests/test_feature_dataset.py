@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pytest
+
+import src.feature_dataset as fd
+from src.distribution_generators import generate_chi, generate_chi2
+
+SPEC = dict(
+    h0=(generate_chi2, {"nu": 5}),
+    h1=(generate_chi, {"nu": 5}),
+    n=40,
+    n_samples=25,
+    graph_type="distance",
+    graph_param=0.3,
+    features=["max_degree", "connected_components", "clique_number"],
+    chunk_size=10,
+    seed=3,
+)
+
+
+def test_memmap_and_npz_give_same_chunks(tmp_path):
+    memmap = fd.build_feature_dataset(tmp_path / "mm", **SPEC)
+    npz = fd.build_feature_dataset(tmp_path / "npz", format="npz", **SPEC)
+    assert memmap.complete and len(memmap) == len(npz) == 50
+    X, y = memmap.arrays()
+    assert X.dtype == np.float32 and X.shape == (50, 3)
+    assert np.bincount(y).tolist() == [25, 25]
+    np.testing.assert_array_equal(X, npz.arrays()[0])
+    sizes = [X.shape[0] for X, _ in npz.iter_chunks(shuffle=True, seed=0)]
+    assert sorted(sizes) == [10, 10, 10, 10, 10]
+
+    from sklearn.linear_model import SGDClassifier
+
+    clf = SGDClassifier(random_state=0)
+    for X, y in memmap.iter_chunks():
+        clf.partial_fit(X, y, classes=fd.CLASSES)
+    assert clf.predict(X).shape == y.shape
+
+
+def _interrupt(path, done):
+    """Состояние построения, прерванного после done порций."""
+    meta = json.loads((path / "meta.json").read_text())
+    meta["chunks_done"] = done
+    (path / "meta.json").write_text(json.dumps(meta))
+    if meta["format"] == "npz":
+        for index in range(done, len(meta["chunk_rows"])):
+            (path / f"chunk_{index:06d}.npz").unlink()
+    else:
+        features = np.load(path / "features.npy", mmap_mode="r+")
+        rows = done * SPEC["chunk_size"]
+        features[rows:] = 0
+        features.flush()
+
+
+@pytest.mark.parametrize("format", ["memmap", "npz"])
+def test_resume_rebuilds_only_missing_chunks(tmp_path, monkeypatch, format):
+    path = tmp_path / format
+    expected = fd.build_feature_dataset(path, format=format, **SPEC).arrays()
+    expected = np.array(expected[0]), np.array(expected[1])
+    _interrupt(path, 2)
+    partial = fd.FeatureDataset(path)
+    assert not partial.complete and len(partial) == 20
+    with pytest.raises(IndexError):
+        partial.chunk(2)
+
+    original = fd._chunk
+    calls = []
+    monkeypatch.setattr(
+        fd, "_chunk", lambda *a, **k: calls.append(a) or original(*a, **k)
+    )
+    resumed = fd.build_feature_dataset(path, format=format, **SPEC)
+    assert len(calls) == 3
+    meta = json.loads((path / "meta.json").read_text())
+    assert meta["chunks_done"] == 5 and meta["chunk_rows"] == [10] * 5
+    assert not list(path.glob("*.tmp*"))
+    if format == "npz":
+        assert sorted(p.name for p in path.glob("chunk_*.npz")) == [
+            f"chunk_{i:06d}.npz" for i in range(5)
+        ]
+    np.testing.assert_array_equal(resumed.arrays()[0], expected[0])
+    np.testing.assert_array_equal(resumed.arrays()[1], expected[1])
+    with pytest.raises(ValueError):
+        fd.build_feature_dataset(path, format=format, **{**SPEC, "n": 50})
@@ -2,6 +2,7 @@ import numpy as np
 import networkx as nx
 from src.graph_analyzer import GraphAnalyzer
 from src.build_graph import build_distance_graph
+from src.csr_graph import CSRGraph
 
 
 def test_max_degree_and_chromatic_and_triangles():
@@ -62,3 +63,151 @@ def test_clique_number_on_distance_graph():
     # Наибольшая клика должна соответствовать максимальному количеству точек
     # попадающих в интервал длины d: [0,2] -> 3 точки (0.0,1.0,2.0)
     assert ga.clique_number(d=d) == 3
+
+
+def test_csr_graph_metrics_match_networkx():
+    from src.csr_graph import CSRGraph
+
+    metrics = [
+        "max_degree",
+        "min_degree",
+        "connected_components",
+        "articulation_points",
+        "count_triangles",
+        "chromatic_number",
+    ]
+    for seed in range(20):
+        G = nx.gnp_random_graph(40, 0.1 + 0.02 * seed, seed=seed)
+        ga_nx = GraphAnalyzer(G)
+        ga_csr = GraphAnalyzer(CSRGraph.from_networkx(G))
+        for metric in metrics:
+            assert getattr(ga_csr, metric)() == getattr(ga_nx, metric)(), metric
+
+
+def test_dsatur_and_triangles_identical_to_networkx():
+    from src import csr_graph
+    from src.build_graph import build_knn_graph
+
+    graphs = [
+        nx.gnp_random_graph(60, 0.05 * (1 + seed % 8), seed=seed) for seed in range(16)
+    ]
+    data = np.random.default_rng(1).normal(size=300)
+    graphs += [build_knn_graph(data, k) for k in (1, 3, 10)]
+    for G in graphs:
+        g = csr_graph.CSRGraph.from_networkx(G)
+        colors = nx.coloring.greedy_color(G, strategy="DSATUR")
+        expected = np.array([colors[v] for v in G.nodes])
+        np.testing.assert_array_equal(csr_graph.dsatur_coloring(g), expected)
+        triangles = sum(nx.triangles(G).values()) // 3
+        assert csr_graph.count_triangles(g) == triangles
+
+
+def test_csr_graph_from_builder_roundtrip():
+    from src.csr_graph import CSRGraph
+
+    data = np.random.default_rng(0).normal(size=200)
+    g = build_distance_graph(data, d=0.05, output="csr_graph")
+    assert isinstance(g, CSRGraph)
+    G = build_distance_graph(data, d=0.05)
+    assert nx.utils.graphs_equal(g.to_networkx(), G)
+    fast = GraphAnalyzer(g).clique_number(d=0.05)
+    assert fast == GraphAnalyzer(G).clique_number(d=0.05)
+
+
+def test_interval_mode_matches_exact_networkx():
+    data = np.round(np.random.default_rng(3).normal(size=25), 1)
+    d = 0.3
+    G = build_distance_graph(data, d=d)
+    fast = GraphAnalyzer(G)
+    assert fast.interval is not None
+    plain = nx.Graph(G)
+    plain.graph.clear()
+    slow = GraphAnalyzer(plain)
+    assert slow.interval is None
+    for metric in [
+        "max_degree",
+        "min_degree",
+        "connected_components",
+        "articulation_points",
+        "count_triangles",
+    ]:
+        assert getattr(fast, metric)() == getattr(slow, metric)(), metric
+    omega = max(len(c) for c in nx.find_cliques(G))
+    assert fast.chromatic_number() == omega == fast.clique_number()
+    assert fast.max_independent_set() == slow.max_independent_set(exact=True)
+    assert fast.min_clique_cover() == fast.max_independent_set()
+
+
+def test_interval_dominating_number_exact():
+    # точки 0, 1, 2, 3, 4 при d=1 — путь P5, γ(P5) = 2
+    G = build_distance_graph(np.arange(5.0), d=1.0)
+    assert GraphAnalyzer(G).dominating_number() == 2
+    # d можно передать явно для графа без G.graph['d']
+    G.graph.clear()
+    assert GraphAnalyzer(G, d=1.0).dominating_number() == 2
+
+
+def test_summary_matches_metrics_and_invalidate():
+    G = nx.gnp_random_graph(25, 0.3, seed=1)
+    ga = GraphAnalyzer(G)
+    summary = ga.summary()
+    assert "clique_number" not in summary
+    for metric, value in summary.items():
+        assert getattr(GraphAnalyzer(G), metric)() == value
+
+    ga.G.add_edges_from((0, v) for v in range(1, 25))
+    ga.invalidate()
+    assert ga.max_degree() == 24
+    assert ga.connected_components() == 1
+
+    # изменение дистанционного графа выключает режим интервалов
+    for output in ("networkx", "csr_graph"):
+        g = build_distance_graph(np.array([0.0, 5.0, 10.0]), d=1.0, output=output)
+        ga = GraphAnalyzer(g)
+        assert ga.connected_components() == 3 and ga.max_degree() == 0
+        ga.G.add_edge(0, 1)
+        ga.G.add_edge(1, 2)
+        ga.invalidate()
+        assert ga.interval is None
+        assert ga.connected_components() == 1
+        assert ga.max_degree() == 2
+
+    data = np.random.default_rng(0).normal(size=40)
+    ga = GraphAnalyzer(build_distance_graph(data, d=0.3, output="csr_graph"))
+    summary = ga.summary()
+    assert summary["clique_number"] == ga.chromatic_number()
+    assert ga.clique_number(d=0.6) == GraphAnalyzer(
+        build_distance_graph(data, d=0.6)
+    ).clique_number()
+
+
+def test_interval_mode_requires_matching_edges():
+    G = build_distance_graph(np.array([0.0, 0.5, 1.0]), d=1.0)
+    assert GraphAnalyzer(G).interval is not None
+    G.remove_edge(0, 2)
+    ga = GraphAnalyzer(G)
+    assert ga.interval is None
+    assert ga.count_triangles() == 0
+    assert ga.max_degree() == 2 and ga.min_degree() == 1
+
+    # перестановка рёбер сохраняет все степени, но не сам граф
+    for output in ("networkx", "csr_graph"):
+        g = build_distance_graph([0, 0.1, 0.2, 5, 5.5, 6.0], 0.6, output=output)
+        G = g if output == "networkx" else g.to_networkx()
+        G.remove_edges_from([(0, 1), (3, 4)])
+        G.add_edges_from([(0, 3), (1, 4)])
+        ga = GraphAnalyzer(G if output == "networkx" else CSRGraph.from_networkx(G))
+        assert ga.interval is None
+        assert ga.count_triangles() == 0
+        assert ga.connected_components() == 1
+
+
+def test_clique_number_for_multidimensional_coordinates():
+    X = np.random.default_rng(2).normal(size=(150, 2))
+    for output in ("networkx", "csr_graph"):
+        g = build_distance_graph(X, d=0.5, output=output)
+        ga = GraphAnalyzer(g)
+        assert ga.interval is None and ga.sorted_coordinates() is None
+        G = g if output == "networkx" else g.to_networkx()
+        assert ga.clique_number() == max(len(c) for c in nx.find_cliques(G))
+        assert ga.summary()["clique_number"] == ga.clique_number()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from src.distribution_generators import sample_normal, sample_stable
+from src.hypothesis_testing import (
+    power_interval,
+    proportion_interval,
+    quantile_interval,
+    sequential_power,
+)
+
+
+def test_proportion_intervals():
+    low, high = proportion_interval(30, 100, method="wilson")
+    z = stats.norm.ppf(0.975)
+    p, n = 0.3, 100
+    center = (p + z**2 / (2 * n)) / (1 + z**2 / n)
+    half = z / (1 + z**2 / n) * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2))
+    assert low == pytest.approx(center - half) and high == pytest.approx(center + half)
+
+    low, high = proportion_interval(30, 100, method="clopper-pearson")
+    assert low == pytest.approx(stats.beta.ppf(0.025, 30, 71))
+    assert high == pytest.approx(stats.beta.ppf(0.975, 31, 70))
+    assert proportion_interval(0, 50)[0] == 0.0
+
+    power, (low, high) = power_interval(np.array([1, 2, 3, 4]), 2)
+    assert power == 0.5 and low < 0.5 < high
+
+
+def test_quantile_interval_covers_true_quantile():
+    rng = np.random.default_rng(0)
+    true = stats.norm.ppf(0.95)
+    hits = [
+        low <= true <= high
+        for low, high in (
+            quantile_interval(rng.standard_normal(500), 0.95) for _ in range(200)
+        )
+    ]
+    assert np.mean(hits) > 0.9
+
+
+def test_sequential_power_stops_early_and_respects_budget():
+    kwargs = dict(graph_type="distance", graph_param=0.3, metric="max_degree")
+    result = sequential_power(
+        sample_normal,
+        {"sigma": 1.0, "n": 100},
+        sample_stable,
+        {"alpha": 1.0, "n": 100},
+        seed=1,
+        max_samples=2000,
+        **kwargs,
+    )
+    assert result["converged"]
+    assert result["n_h1"] == 100  # мощность около 0: хватило первой порции
+    low, high = result["power_interval"]
+    assert (high - low) / 2 <= 0.02
+    assert result["critical_interval"][0] <= result["critical_value"]
+
+    budget = sequential_power(
+        sample_normal,
+        {"sigma": 1.0, "n": 50},
+        sample_normal,
+        {"sigma": 1.0, "n": 50},
+        power_tol=0.001,
+        seed=2,
+        max_samples=300,
+        **kwargs,
+    )
+    assert not budget["converged"]
+    assert budget["n_h1"] == 300
+
+
+def test_sequential_power_continuous_statistic_and_metric_list(monkeypatch):
+    from src.graph_analyzer import GraphAnalyzer
+
+    monkeypatch.setattr(
+        GraphAnalyzer,
+        "mean_degree",
+        lambda self: float(self.degrees().mean()),
+        raising=False,
+    )
+    args = (sample_normal, {"sigma": 1.0, "n": 30}, sample_stable, {"alpha": 1.0, "n": 30})
+    kwargs = dict(graph_type="distance", graph_param=0.3, seed=1)
+    # точность по умолчанию для нецелой статистики достижима
+    result = sequential_power(*args, alpha=0.5, metric="mean_degree", **kwargs)
+    assert result["converged"] and result["n_h0"] < 10000
+    with pytest.raises(ValueError):
+        sequential_power(*args, critical_tol=0, metric="mean_degree", **kwargs)
+    with pytest.raises(ValueError):
+        sequential_power(*args, metric=["max_degree", "min_degree"], **kwargs)
@@ -0,0 +1,52 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.build_graph import build_knn_graph
+from src.graph_analyzer import GraphAnalyzer
+from src.incremental_graph import IncrementalDistanceGraph, IncrementalKNNGraph
+
+
+def _expected(graph):
+    ga = graph.analyzer()
+    return {
+        "max_degree": ga.max_degree(),
+        "min_degree": ga.min_degree(),
+        "connected_components": ga.connected_components(),
+        "clique_number": max(len(c) for c in nx.find_cliques(ga.G)),
+        "count_triangles": ga.count_triangles(),
+    }
+
+
+@pytest.mark.parametrize(
+    "graph", [IncrementalDistanceGraph(0.3), IncrementalKNNGraph(3)], ids=["d", "knn"]
+)
+def test_running_statistics_match_snapshot(graph):
+    rng = np.random.default_rng(0)
+    live = []
+    for step in range(300):
+        if len(live) > 5 and rng.random() < 0.4:
+            graph.remove(live.pop(int(rng.integers(len(live)))))
+        else:
+            # округление даёт совпадающие координаты
+            live.append(float(np.round(rng.normal(), 1)))
+            graph.insert(live[-1])
+        assert graph.summary() == _expected(graph)
+    assert sorted(graph.coordinates()) == sorted(live)
+    if isinstance(graph, IncrementalKNNGraph):
+        rows, cols = graph.snapshot("edges")
+        expected = build_knn_graph(graph.coordinates(), 3, output="edges")
+        assert rows.tolist() == expected[0].tolist()
+        assert cols.tolist() == expected[1].tolist()
+
+
+def test_remove_takes_earliest_point_and_snapshot_keeps_d():
+    graph = IncrementalDistanceGraph(1.0)
+    ids = [graph.insert(x) for x in (0.0, 0.5, 0.0, 3.0)]
+    assert graph.remove(0.0) == ids[0]
+    assert graph.ids().tolist() == ids[1:]
+    with pytest.raises(ValueError):
+        graph.remove(7.0)
+    ga = graph.analyzer()
+    assert isinstance(ga, GraphAnalyzer) and ga.d == 1.0 and ga.interval is not None
+    assert graph.connected_components() == ga.connected_components() == 2
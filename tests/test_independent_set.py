@@ -0,0 +1,52 @@
+import time
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.build_graph import build_knn_graph
+from src.csr_graph import CSRGraph
+from src.graph_analyzer import GraphAnalyzer
+from src.independent_set import maximum_independent_set
+
+
+@pytest.mark.parametrize("p", [0.1, 0.3, 0.6])
+def test_matches_cliques_of_complement(p):
+    for seed in range(10):
+        G = nx.gnp_random_graph(8 + 2 * seed, p, seed=seed)
+        result = maximum_independent_set(CSRGraph.from_networkx(G))
+        alpha = max(len(c) for c in nx.find_cliques(nx.complement(G)))
+        assert result.size == alpha
+        assert result.optimal and result.upper_bound == alpha
+        chosen = set(result.nodes.tolist())
+        assert not any(u in chosen and v in chosen for u, v in G.edges())
+
+
+def test_budget_returns_proven_bound():
+    G = nx.gnp_random_graph(100, 0.1, seed=1)
+    result = maximum_independent_set(CSRGraph.from_networkx(G), node_limit=5)
+    alpha = maximum_independent_set(CSRGraph.from_networkx(G)).size
+    assert not result.optimal
+    assert result.size <= alpha <= result.upper_bound
+    chosen = set(result.nodes.tolist())
+    assert not any(u in chosen and v in chosen for u, v in G.edges())
+
+
+def test_graph_analyzer_exact():
+    G = nx.relabel_nodes(nx.gnp_random_graph(30, 0.2, seed=3), lambda v: f"v{v}")
+    ga = GraphAnalyzer(G)
+    alpha = max(len(c) for c in nx.find_cliques(nx.complement(G)))
+    assert ga.max_independent_set(exact=True) == alpha
+    chosen = set(ga.exact_independent_set().nodes.tolist())
+    assert len(chosen) == alpha and chosen <= set(G.nodes)
+    assert not any(u in chosen and v in chosen for u, v in G.edges())
+
+
+@pytest.mark.parametrize("k", [5, 10, 20])
+def test_knn_graph_solved_quickly(k):
+    data = np.random.default_rng(k).standard_normal(300)
+    g = build_knn_graph(data, k, output="csr_graph")
+    start = time.perf_counter()
+    result = maximum_independent_set(g, time_limit=10)
+    assert result.optimal
+    assert time.perf_counter() - start < 2
@@ -0,0 +1,197 @@
+import numpy as np
+import pytest
+from src.distribution_generators import generate_chi2
+from src.monte_carlo import monte_carlo_simulation, sweep
+
+
+@pytest.mark.parametrize(
+    "graph_type, graph_param, metric",
+    [
+        ("distance", 0.5, "max_degree"),
+        ("distance", 0.5, "connected_components"),
+        ("distance", 0.5, "articulation_points"),
+        ("distance", 0.5, "count_triangles"),
+        ("distance", 0.5, "clique_number"),
+        ("distance", 0.5, "dominating_number"),
+        ("knn", 3, "max_degree"),
+        ("knn", 3, "min_degree"),
+    ],
+)
+def test_batched_matches_loop(graph_type, graph_param, metric):
+    kwargs = dict(
+        params={"nu": 5, "n": 60},
+        n_samples=20,
+        graph_type=graph_type,
+        graph_param=graph_param,
+        metric=metric,
+    )
+    np.random.seed(0)
+    batched = monte_carlo_simulation(generate_chi2, **kwargs)
+    np.random.seed(0)
+    loop = monte_carlo_simulation(generate_chi2, batched=False, **kwargs)
+    assert batched.shape == (20,)
+    np.testing.assert_array_equal(batched, loop)
+
+
+def test_unbatched_metric_falls_back_to_loop():
+    np.random.seed(0)
+    T = monte_carlo_simulation(
+        generate_chi2,
+        {"nu": 5, "n": 30},
+        n_samples=5,
+        graph_type="knn",
+        graph_param=2,
+        metric="count_triangles",
+    )
+    assert T.shape == (5,)
+
+
+def test_seeded_runs_independent_of_worker_count():
+    from concurrent.futures import ProcessPoolExecutor
+
+    kwargs = dict(
+        params={"nu": 5, "n": 40},
+        n_samples=50,
+        graph_type="knn",
+        graph_param=3,
+        metric="count_triangles",
+        seed=123,
+        chunk_size=16,
+    )
+    serial = monte_carlo_simulation(generate_chi2, **kwargs)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = monte_carlo_simulation(generate_chi2, executor=pool, **kwargs)
+    np.testing.assert_array_equal(serial, parallel)
+    assert serial.shape == (50,)
+    other = monte_carlo_simulation(generate_chi2, **{**kwargs, "seed": 124})
+    assert not np.array_equal(serial, other)
+
+
+def test_metric_list_gives_structured_result():
+    kwargs = dict(
+        params={"nu": 5, "n": 40},
+        n_samples=30,
+        graph_type="distance",
+        graph_param=0.5,
+        seed=7,
+    )
+    metrics = ["max_degree", "clique_number", "count_triangles"]
+    table = monte_carlo_simulation(
+        generate_chi2,
+        metric=metrics + ["dominating_number"],
+        metric_args={"clique_number": {"d": 1.0}},
+        **kwargs,
+    )
+    assert table.dtype.names == tuple(metrics + ["dominating_number"])
+    for metric in metrics:
+        args = {"d": 1.0} if metric == "clique_number" else None
+        single = monte_carlo_simulation(
+            generate_chi2, metric=metric, metric_args=args, **kwargs
+        )
+        np.testing.assert_array_equal(table[metric], single)
+    loop = monte_carlo_simulation(
+        generate_chi2,
+        metric=metrics,
+        metric_args={"clique_number": {"d": 1.0}},
+        batched=False,
+        **kwargs,
+    )
+    for metric in metrics:
+        np.testing.assert_array_equal(table[metric], loop[metric])
+
+
+@pytest.mark.parametrize(
+    "graph_type, graph_params, metrics",
+    [
+        ("distance", [1.0, 0.2, 0.5], ["max_degree", "connected_components"]),
+        ("knn", [2, 5, 3], ["max_degree", "count_triangles"]),
+    ],
+)
+def test_sweep_matches_loop_with_common_random_numbers(
+    graph_type, graph_params, metrics
+):
+    kwargs = dict(
+        grid={"nu": [3, 5], "n": [40, 20]},
+        graph_type=graph_type,
+        graph_params=graph_params,
+        metric=metrics,
+        n_samples=10,
+        seed=3,
+    )
+    table = sweep(generate_chi2, **kwargs)
+    param = "k" if graph_type == "knn" else "d"
+    assert list(table.columns) == ["nu", "n", param, "metric", "replicate", "value"]
+    assert len(table) == 2 * 2 * 3 * len(metrics) * 10
+    assert table.equals(sweep(generate_chi2, batched=False, **kwargs))
+
+    # общие данные: при росте параметра степень каждого повторения не убывает
+    degrees = table[table.metric == "max_degree"].pivot_table(
+        index=["nu", "n", "replicate"], columns=param, values="value"
+    )
+    assert (np.diff(degrees.to_numpy(), axis=1) >= 0).all()
+
+
+def test_profiler_stages_counters_and_exports(tmp_path):
+    import json
+    import pstats
+    from concurrent.futures import ProcessPoolExecutor
+
+    from src.instrumentation import Profiler
+
+    kwargs = dict(
+        params={"nu": 5, "n": 40},
+        n_samples=48,
+        graph_type="knn",
+        graph_param=3,
+        metric=["max_degree", "count_triangles"],
+        seed=7,
+        chunk_size=16,
+    )
+    events = []
+    profiler = Profiler(callback=events.append)
+    result = monte_carlo_simulation(generate_chi2, profiler=profiler, **kwargs)
+    np.testing.assert_array_equal(
+        result, monte_carlo_simulation(generate_chi2, **kwargs)
+    )
+
+    stages = profiler.to_dict()["stages"]
+    assert {"total", "generate", "batched", "build", "metric:count_triangles"} <= set(
+        stages
+    )
+    assert stages["build"]["calls"] == 48
+    counters = profiler.counters
+    assert counters["samples"] == counters["graphs"] == counters["batched_rows"] == 48
+    assert counters["nodes"] == 48 * 40 and counters["edges"] > 0
+    assert [event["done"] for event in events] == [16, 32, 48]
+
+    # порции из процессов пула учитываются так же
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled = Profiler()
+        monte_carlo_simulation(generate_chi2, executor=pool, profiler=pooled, **kwargs)
+    assert pooled.counters == counters
+
+    data = json.loads(profiler.to_json(tmp_path / "profile.json"))
+    assert data["counters"]["graphs"] == 48
+    profiler.dump_stats(tmp_path / "profile.pstats")
+    stats = pstats.Stats(str(tmp_path / "profile.pstats"))
+    assert ("monte_carlo", 0, "build") in stats.stats
+
+
+def test_profiler_reports_progress_without_seed():
+    from src.instrumentation import Profiler
+
+    kwargs = dict(n_samples=200, graph_type="distance", graph_param=0.3)
+    events = []
+    np.random.seed(3)
+    result = monte_carlo_simulation(
+        generate_chi2,
+        {"nu": 5, "n": 40},
+        profiler=Profiler(callback=events.append),
+        **kwargs,
+    )
+    done = [event["done"] for event in events]
+    assert len(done) > 1 and done == sorted(done) and done[-1] == 200
+    np.random.seed(3)
+    np.testing.assert_array_equal(
+        result, monte_carlo_simulation(generate_chi2, {"nu": 5, "n": 40}, **kwargs)
+    )
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import src.monte_carlo as mc
+from src.distribution_generators import generate_chi2
+from src.result_cache import ResultCache, cache_info
+
+KWARGS = dict(
+    params={"nu": 5, "n": 30},
+    n_samples=40,
+    graph_type="distance",
+    graph_param=0.5,
+    metric=["max_degree", "connected_components"],
+    seed=11,
+    chunk_size=10,
+)
+
+
+def test_cached_result_is_memmap(tmp_path):
+    expected = mc.monte_carlo_simulation(generate_chi2, **KWARGS)
+    first = mc.monte_carlo_simulation(generate_chi2, cache=tmp_path, **KWARGS)
+    second = mc.monte_carlo_simulation(generate_chi2, cache=tmp_path, **KWARGS)
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, expected)
+    np.testing.assert_array_equal(second, expected)
+    info = cache_info(tmp_path)
+    assert info["entries"] == 1 and info["incomplete"] == 0
+    other = mc.monte_carlo_simulation(
+        generate_chi2, cache=tmp_path, **{**KWARGS, "seed": 12}
+    )
+    assert not np.array_equal(other, expected)
+    assert cache_info(tmp_path)["entries"] == 2
+
+    with pytest.raises(ValueError):
+        mc.monte_carlo_simulation(
+            generate_chi2, cache=tmp_path, **{**KWARGS, "seed": None}
+        )
+
+
+def test_interrupted_run_resumes_from_checkpoints(tmp_path, monkeypatch):
+    expected = mc.monte_carlo_simulation(generate_chi2, **KWARGS)
+    original = mc.simulate_chunk
+    calls = []
+
+    def failing(*args, **kwargs):
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(mc, "simulate_chunk", failing)
+    with pytest.raises(KeyboardInterrupt):
+        mc.monte_carlo_simulation(generate_chi2, cache=tmp_path, **KWARGS)
+    assert cache_info(tmp_path)["incomplete"] == 1
+
+    calls.clear()
+    monkeypatch.setattr(
+        mc, "simulate_chunk", lambda *a, **k: calls.append(a) or original(*a, **k)
+    )
+    result = mc.monte_carlo_simulation(generate_chi2, cache=tmp_path, **KWARGS)
+    assert len(calls) == 2  # из 4 порций две уже были готовы
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_eviction_keeps_cache_bounded(tmp_path):
+    cache = ResultCache(tmp_path)
+    for seed in range(3):
+        mc.monte_carlo_simulation(
+            generate_chi2, cache=cache, **{**KWARGS, "seed": seed}
+        )
+    size = cache.info()["bytes"]
+    assert cache.info()["entries"] == 3
+    assert cache.evict(max_bytes=size // 2) == 2
+    assert cache.info()["entries"] == 1
+    assert cache.evict(max_age=-1) == 1
+    bounded = ResultCache(tmp_path, max_bytes=1)
+    result = mc.monte_carlo_simulation(generate_chi2, cache=bounded, **KWARGS)
+    assert result.shape == (40,) and bounded.info()["entries"] == 1
@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.distribution_generators import generate_chi, generate_chi2, sample_normal
+from src.scan_statistic import (
+    clique_number_cdf,
+    clique_number_power,
+    validate_clique_number,
+)
+
+
+def test_critical_values_agree_with_monte_carlo():
+    result = validate_clique_number(
+        generate_chi2, {"nu": 5}, n=100, d=0.1, n_samples=1000, seed=0
+    )
+    assert np.abs(result["critical"] - result["empirical_critical"]).max() <= 1
+    assert result["ks"] < 0.1
+
+
+def test_actual_size_close_to_alpha_in_both_regimes():
+    # малая (p_max ~ 0.03) и большая (p_max ~ 0.4) вероятность окна: в
+    # середине распределения ошибка растёт, в хвосте остаётся малой
+    for distribution, params, n, d in (
+        (generate_chi, {"nu": 3}, 200, 0.05),
+        (sample_normal, {"sigma": 1}, 50, 1.0),
+    ):
+        result = validate_clique_number(
+            distribution, params, n=n, d=d, n_samples=2000, seed=1
+        )
+        assert result["tail_error"] < 0.02
+        assert np.all(np.abs(result["size"] - result["alphas"]) < 0.05)
+        assert np.all(result["size"] < result["alphas"] + 0.02)
+
+
+def test_cdf_is_a_distribution_and_power_in_range():
+    cdf = clique_number_cdf(generate_chi2, {"nu": 5}, n=10000, d=0.01)
+    assert cdf.shape == (10001,)
+    assert cdf[0] == 0 and cdf[-1] == 1 and np.all(np.diff(cdf) >= 0)
+    critical, power = clique_number_power(
+        generate_chi2, {"nu": 5}, generate_chi, {"nu": 5}, 200, 0.1, [0.05, 0.01]
+    )
+    assert critical[0] <= critical[1]
+    assert np.all((0 <= power) & (power <= 1)) and power[0] >= power[1]
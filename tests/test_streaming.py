@@ -0,0 +1,101 @@
+import numpy as np
+from scipy import stats
+
+from src.distribution_generators import sample_normal, sample_stable
+from src.hypothesis_testing import (
+    calculate_critical_region,
+    critical_values,
+    estimate_power,
+    power_curve,
+    roc_curve,
+)
+from src.monte_carlo import monte_carlo_simulation
+from src.streaming import StreamingQuantiles
+
+
+def merged(chunks):
+    accumulator = StreamingQuantiles(seed=0)
+    for i, chunk in enumerate(chunks):
+        accumulator.merge(StreamingQuantiles(seed=i + 1).update(chunk))
+    return accumulator
+
+
+def test_integer_histogram_is_exact_after_merge():
+    x = np.random.default_rng(0).poisson(20, size=50000)
+    accumulator = merged(np.array_split(x, 7))
+    assert accumulator.exact and accumulator.count == x.shape[0]
+    qs = np.linspace(0, 1, 41)
+    np.testing.assert_array_equal(accumulator.quantile(qs), np.quantile(x, qs))
+    for threshold in (10, 20, 25.5):
+        assert accumulator.exceedance(threshold) == np.mean(x > threshold)
+
+
+def test_kll_sketch_for_continuous_values():
+    x = np.random.default_rng(1).standard_normal(300000)
+    accumulator = merged(np.array_split(x, 11))
+    assert not accumulator.exact and accumulator.count == x.shape[0]
+    assert sum(level.shape[0] for level in accumulator.sketch.levels) < 2000
+    for q in (0.5, 0.9, 0.95, 0.99):
+        assert abs(stats.norm.cdf(accumulator.quantile(q)) - q) < 0.01
+
+
+def test_monte_carlo_accumulators_match_arrays():
+    kwargs = dict(
+        n_samples=200,
+        graph_type="distance",
+        graph_param=0.3,
+        metric="max_degree",
+        chunk_size=32,
+    )
+    h0 = monte_carlo_simulation(sample_normal, {"sigma": 1.0, "n": 60}, seed=1, **kwargs)
+    h1 = monte_carlo_simulation(sample_stable, {"alpha": 1.5, "n": 60}, seed=2, **kwargs)
+    h0_acc = monte_carlo_simulation(
+        sample_normal, {"sigma": 1.0, "n": 60}, seed=1, accumulate=True, **kwargs
+    )
+    h1_acc = monte_carlo_simulation(
+        sample_stable, {"alpha": 1.5, "n": 60}, seed=2, accumulate=True, **kwargs
+    )
+    assert h0_acc.count == 200
+    crit = calculate_critical_region(h0, 0.05)[1]
+    assert calculate_critical_region(h0_acc, 0.05)[1] == crit
+    assert estimate_power(h1_acc, crit) == estimate_power(h1, crit)
+
+    alphas = [0.01, 0.05, 0.1, 0.2]
+    np.testing.assert_array_equal(
+        critical_values(h0_acc, alphas), np.quantile(h0, 1 - np.array(alphas))
+    )
+    for a, b in zip(power_curve(h0, h1, alphas), power_curve(h0_acc, h1_acc, alphas)):
+        np.testing.assert_array_equal(a, b)
+    for a, b in zip(roc_curve(h0, h1), roc_curve(h0_acc, h1_acc)):
+        np.testing.assert_array_equal(a, b)
+    fpr, tpr, _ = roc_curve(h0, h1)
+    assert fpr[0] == tpr[0] == 0 and fpr[-1] == tpr[-1] == 1
+    assert np.all(np.diff(fpr) >= 0) and np.all(np.diff(tpr) >= 0)
+
+
+def test_accumulate_is_reproducible_for_continuous_metrics(monkeypatch):
+    from src.graph_analyzer import GraphAnalyzer
+
+    monkeypatch.setattr(
+        GraphAnalyzer,
+        "mean_degree",
+        lambda self: float(self.degrees().mean()),
+        raising=False,
+    )
+    kwargs = dict(
+        n_samples=2000,
+        graph_type="distance",
+        graph_param=0.3,
+        metric="mean_degree",
+        chunk_size=500,
+        accumulate=True,
+        seed=3,
+    )
+    runs = [
+        monte_carlo_simulation(sample_normal, {"sigma": 1.0, "n": 30}, **kwargs)
+        for _ in range(3)
+    ]
+    assert not runs[0].exact
+    qs = np.linspace(0, 1, 101)
+    for other in runs[1:]:
+        np.testing.assert_array_equal(other.quantile(qs), runs[0].quantile(qs))
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import numpy as np
+from scipy.stats import gaussian_kde
+
+from src import visualization
+from src.streaming import accumulate
+
+
+def test_import_does_not_load_matplotlib():
+    code = "import sys, src.visualization; print('matplotlib' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_binned_density_matches_gaussian_kde():
+    x = np.random.default_rng(0).poisson(10, size=20000)
+    grid, y = visualization.density(x)
+    reference = gaussian_kde(x)(grid)
+    assert np.abs(y - reference).max() < 0.01 * reference.max()
+    assert abs(y.sum() * (grid[1] - grid[0]) - 1) < 1e-3
+    # гистограмма накопителя даёт ту же плотность, что и сами значения
+    np.testing.assert_allclose(visualization.density(accumulate(x))[1], y, atol=1e-12)
+
+
+def test_render_figures_to_files(tmp_path):
+    rng = np.random.default_rng(1)
+    h0, h1 = rng.poisson(5, 1000), rng.poisson(7, 1000)
+    specs = [
+        {
+            "kind": "distributions",
+            "h0_stats": h0,
+            "h1_stats": accumulate(h1),
+            "metric_name": "max_degree",
+            "save_path": str(tmp_path / "dist.png"),
+        },
+        {
+            "kind": "critical_region",
+            "h0_stats": h0,
+            "h1_stats": h1,
+            "critical_value": 8,
+            "title": "t",
+            "xlabel": "x",
+            "save_path": str(tmp_path / "crit.png"),
+        },
+    ]
+    paths = visualization.render_figures(specs, n_jobs=2)
+    assert paths == [spec["save_path"] for spec in specs]
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"